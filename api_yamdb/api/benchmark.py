@@ -0,0 +1,175 @@
+import time
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import Comment, Review, Title, TitleGenre
+from users.models import User
+
+API_URL = '/api/v1'
+# Эндпоинты роутера api/urls.py: название, путь и параметры запроса.
+ENDPOINTS = (
+    ('users', '/users/', {}),
+    ('user', '/users/{username}/', {}),
+    ('me', '/users/me/', {}),
+    ('categories', '/categories/', {}),
+    ('genres', '/genres/', {}),
+    ('titles', '/titles/', {}),
+    ('titles filtered', '/titles/', {
+        'category': '{category}', 'genre': '{genre}', 'ordering': '-rating'
+    }),
+    ('titles search', '/titles/', {'search': '{word}'}),
+    ('titles cursor', '/titles/', {'cursor': ''}),
+    ('titles top', '/titles/top/', {}),
+    ('titles export', '/titles/export/', {}),
+    ('title', '/titles/{title}/', {}),
+    ('reviews', '/titles/{title}/reviews/', {}),
+    ('reviews cursor', '/titles/{title}/reviews/', {'cursor': ''}),
+    ('review', '/titles/{title}/reviews/{review}/', {}),
+    ('comments', '/titles/{title}/reviews/{review}/comments/', {}),
+    ('comment', '/titles/{title}/reviews/{review}/comments/{comment}/', {}),
+)
+PERCENTILES = (50, 95, 99)
+# Рост задержки меньше этого значения в миллисекундах считается шумом.
+LATENCY_NOISE_MS = 1.0
+
+
+def get_samples():
+    """Объекты для путей эндпоинтов: произведение с наибольшим
+    количеством отзывов, его отзыв с комментарием, категория, жанр
+    и пользователь. Для пустой базы пути ведут на 404.
+    """
+    samples = {
+        'title': 0, 'review': 0, 'comment': 0, 'category': '',
+        'genre': '', 'username': '', 'word': '',
+    }
+    title = Title.objects.order_by('-rating_count', '-id').values(
+        'id', 'name', 'category__slug'
+    ).first()
+    if title is None:
+        return samples
+    samples.update(
+        title=title['id'], category=title['category__slug'] or '',
+        word=title['name'].split()[0].lower()
+    )
+    samples['genre'] = TitleGenre.objects.filter(
+        title=title['id'], genre__isnull=False
+    ).values_list('genre__slug', flat=True).first() or ''
+    comment = Comment.objects.filter(review__title=title['id']).values(
+        'id', 'review_id'
+    ).first()
+    if comment:
+        samples.update(comment=comment['id'], review=comment['review_id'])
+    else:
+        samples['review'] = Review.objects.filter(
+            title=title['id']
+        ).values_list('id', flat=True).first() or 0
+    samples['username'] = Review.objects.filter(
+        pk=samples['review']
+    ).values_list('author__username', flat=True).first() or ''
+    return samples
+
+
+def format_endpoint(path, params, samples):
+    return API_URL + path.format(**samples), {
+        key: str(value).format(**samples) for key, value in params.items()
+    }
+
+
+def get_client():
+    """Клиент администратора с JWT, чтобы были доступны все эндпоинты."""
+    admin, _ = User.objects.get_or_create(
+        username='benchmark-admin',
+        defaults={'email': 'benchmark-admin@yamdb.fake', 'role': 'admin'}
+    )
+    token = AccessToken.for_user(admin)
+    return Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+
+def read_content(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+def percentile(ordered, percent):
+    """Перцентиль отсортированных значений с линейной интерполяцией
+    между соседними, как statistics.quantiles(method='inclusive')
+    из Python 3.8.
+    """
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (
+        (ordered[upper] - ordered[lower]) * (position - lower)
+    )
+
+
+def measure(client, path, params, iterations, warmup):
+    """Задержки запроса в миллисекундах по перцентилям, количество
+    SQL-запросов и размер ответа. Запросы считаются отдельным
+    прогоном, чтобы их запись не влияла на задержки.
+    """
+    for _ in range(warmup):
+        read_content(client.get(path, params))
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.get(path, params)
+        content = read_content(response)
+        timings.append((time.perf_counter() - start) * 1000)
+    with CaptureQueriesContext(connection) as context:
+        read_content(client.get(path, params))
+    timings.sort()
+    result = {
+        f'p{percent}': round(percentile(timings, percent), 3)
+        for percent in PERCENTILES
+    }
+    result.update(
+        status=response.status_code,
+        queries=len(context.captured_queries),
+        bytes=len(content)
+    )
+    return result
+
+
+def run_benchmark(iterations=20, warmup=2, names=None):
+    """Прогоняет эндпоинты ENDPOINTS (или только names) тестовым
+    клиентом Django и возвращает метрики по названиям.
+    """
+    samples = get_samples()
+    client = get_client()
+    results = {}
+    for name, path, params in ENDPOINTS:
+        if names and name not in names:
+            continue
+        results[name] = measure(
+            client, *format_endpoint(path, params, samples),
+            iterations=max(iterations, 2), warmup=warmup
+        )
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Сравнивает метрики с базовыми и возвращает список регрессий:
+    больше SQL-запросов, p95 или размер ответа выросли больше
+    чем на tolerance (p95 еще и больше чем на LATENCY_NOISE_MS).
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if current['queries'] > base['queries']:
+            regressions.append(
+                f'{name}: queries {base["queries"]} -> {current["queries"]}'
+            )
+        for metric, noise in (('p95', LATENCY_NOISE_MS), ('bytes', 0)):
+            limit = max(base[metric] * (1 + tolerance), base[metric] + noise)
+            if current[metric] > limit:
+                regressions.append(
+                    f'{name}: {metric} {base[metric]} -> {current[metric]}'
+                )
+    return regressions
@@ -0,0 +1,152 @@
+from django.db import IntegrityError, connection, transaction
+from django.db.models import prefetch_related_objects
+from django.utils.encoding import smart_str
+from rest_framework import exceptions, response, serializers, status
+
+from reviews.signals import post_bulk_create
+
+# SQLSTATE нарушения ограничения уникальности в PostgreSQL.
+UNIQUE_VIOLATION = '23505'
+
+
+def is_unique_violation(error, constraint=None):
+    """Вызвана ли IntegrityError ограничением уникальности.
+    На PostgreSQL сверяется и имя ограничения constraint,
+    SQLite его не сообщает.
+    """
+    cause = error.__cause__
+    if getattr(cause, 'pgcode', None) is not None:
+        return cause.pgcode == UNIQUE_VIOLATION and (
+            constraint is None or cause.diag.constraint_name == constraint
+        )
+    return 'UNIQUE constraint failed' in str(error)
+
+
+class BulkSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, который при пакетной записи берет объекты
+    из словаря, загруженного BulkListSerializer одним запросом.
+    """
+
+    def to_internal_value(self, data):
+        objects = self.context.get('slug_objects', {}).get(
+            self.queryset.model
+        )
+        if objects is None:
+            return super().to_internal_value(data)
+        try:
+            return objects[smart_str(data)]
+        except KeyError:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field,
+                value=smart_str(data)
+            )
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """Пакетная запись: слаги связанных объектов загружаются разом,
+    объекты вставляются через bulk_create.
+    """
+
+    def get_slug_fields(self):
+        for name, field in self.child.fields.items():
+            relation = getattr(field, 'child_relation', field)
+            if isinstance(relation, BulkSlugRelatedField):
+                yield name, relation
+
+    def preload_slugs(self, data):
+        slug_objects = {}
+        for name, relation in self.get_slug_fields():
+            values = set()
+            for item in data:
+                value = item.get(name) if isinstance(item, dict) else None
+                values.update(
+                    smart_str(slug)
+                    for slug in (value if isinstance(value, list)
+                                 else [value])
+                    if isinstance(slug, (str, int))
+                )
+            objects = relation.get_queryset().filter(
+                **{f'{relation.slug_field}__in': values}
+            )
+            slug_objects.setdefault(relation.queryset.model, {}).update(
+                (smart_str(getattr(obj, relation.slug_field)), obj)
+                for obj in objects
+            )
+        self.context['slug_objects'] = slug_objects
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.preload_slugs(data)
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        m2m_fields = [
+            field for field in model._meta.many_to_many
+            if any(field.name in attrs for attrs in validated_data)
+        ]
+        instances, related = [], []
+        for attrs in validated_data:
+            attrs = dict(attrs)
+            related.append({
+                field: attrs.pop(field.name, []) for field in m2m_fields
+            })
+            instances.append(model(**attrs))
+        if connection.features.can_return_rows_from_bulk_insert:
+            self.bulk_insert(model, instances, related, m2m_fields)
+        else:
+            # Без RETURNING у новых объектов нет id, сохраняем по одному.
+            for instance, values in zip(instances, related):
+                instance.save()
+                for field, objects in values.items():
+                    getattr(instance, field.name).set(objects)
+        prefetch_related_objects(
+            instances, *(field.name for field in m2m_fields)
+        )
+        return instances
+
+    def bulk_insert(self, model, instances, related, m2m_fields):
+        model.objects.bulk_create(instances)
+        for field in m2m_fields:
+            through = field.remote_field.through
+            through.objects.bulk_create(
+                through(**{
+                    field.m2m_field_name(): instance,
+                    field.m2m_reverse_field_name(): obj,
+                })
+                for instance, values in zip(instances, related)
+                for obj in values[field]
+            )
+        post_bulk_create.send(sender=model, instances=instances)
+
+
+class BulkCreateMixin:
+    """POST с JSON-массивом создает все объекты одной транзакцией.
+    Массив проверяется одним сериализатором (many=True), при ошибках
+    ничего не сохраняется и возвращается список ошибок по элементам.
+    Нарушение уникальности возвращается как 400, остальные ошибки
+    базы не перехватываются.
+    """
+    bulk_max_items = 1000
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        if len(request.data) > self.bulk_max_items:
+            raise exceptions.ValidationError({
+                'detail': f'Не больше {self.bulk_max_items} объектов за раз'
+            })
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic():
+                self.perform_create(serializer)
+        except IntegrityError as error:
+            if not is_unique_violation(error):
+                raise
+            raise exceptions.ValidationError({
+                'detail': 'Объекты нарушают ограничения уникальности'
+            })
+        return response.Response(
+            serializer.data, status=status.HTTP_201_CREATED
+        )
@@ -0,0 +1,73 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import urlencode
+from rest_framework import response
+
+
+def get_list_cache():
+    return caches[settings.LIST_CACHE_ALIAS]
+
+
+class VersionedListCacheMixin:
+    """Кэширует ответы списка с учетом параметров запроса.
+    Ключ содержит номер версии списка, который увеличивается
+    при создании и удалении объектов, так что старые ответы
+    больше не читаются и вытесняются кэшем по таймауту.
+    Кэш может вытеснить и сам номер версии, поэтому новый номер
+    берется из текущего времени в наносекундах: он больше всех
+    выданных раньше и не совпадает с версией старых ответов.
+    """
+    cache_key_params = ('search', 'limit', 'offset')
+
+    def get_cache_version_key(self):
+        return f'list:{self.basename}:version'
+
+    def get_cache_version(self):
+        cache = get_list_cache()
+        version_key = self.get_cache_version_key()
+        version = cache.get(version_key)
+        if version is None:
+            version = time.time_ns()
+            cache.add(version_key, version, timeout=None)
+            version = cache.get(version_key, version)
+        return version
+
+    def bump_cache_version(self):
+        cache = get_list_cache()
+        version_key = self.get_cache_version_key()
+        try:
+            cache.incr(version_key)
+        except ValueError:
+            cache.add(version_key, time.time_ns(), timeout=None)
+
+    def get_list_cache_key(self, request):
+        params = urlencode(sorted(
+            (param, request.query_params[param])
+            for param in self.cache_key_params
+            if param in request.query_params
+        ))
+        version = self.get_cache_version()
+        return (
+            f'list:{self.basename}:v{version}:'
+            f'{request.get_host()}:{params}'
+        )
+
+    def list(self, request, *args, **kwargs):
+        cache = get_list_cache()
+        key = self.get_list_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return response.Response(data)
+        list_response = super().list(request, *args, **kwargs)
+        cache.set(key, list_response.data, settings.LIST_CACHE_TIMEOUT)
+        return list_response
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self.bump_cache_version()
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        self.bump_cache_version()
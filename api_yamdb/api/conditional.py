@@ -0,0 +1,60 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """Добавляет ETag и Last-Modified к спискам и объектам
+    и отвечает 304 на условные запросы без сериализации данных.
+    Методы get_list_validator и get_object_validator возвращают
+    пару (время изменения, версия) по дешевому запросу к базе,
+    None отключает проверку.
+    """
+
+    def get_list_validator(self):
+        return None
+
+    def get_object_validator(self):
+        return None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_list_validator, super().list,
+            request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_object_validator, super().retrieve,
+            request, *args, **kwargs
+        )
+
+    def get_etag(self, request, validator):
+        key = ':'.join((
+            str(validator),
+            request.get_host(),
+            request.get_full_path(),
+            request.accepted_media_type or '',
+        ))
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def conditional_response(self, get_validator, handler,
+                             request, *args, **kwargs):
+        validator = get_validator()
+        if validator is None:
+            return handler(request, *args, **kwargs)
+        last_modified, version = validator
+        etag = self.get_etag(request, validator)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if not_modified is not None:
+            return not_modified
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
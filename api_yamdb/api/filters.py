@@ -1,18 +1,97 @@
+from django.db.models import Exists, F, OuterRef
 from django_filters import rest_framework
+from rest_framework import filters
 
 from reviews import models
+from reviews.search import search_titles
+
+
+def split_slugs(value):
+    return [slug for slug in map(str.strip, value.split(',')) if slug]
+
+
+def has_genres(slugs):
+    """EXISTS-подзапрос к TitleGenre: у произведения есть жанр из slugs.
+    В отличие от JOIN не размножает строки произведений.
+    """
+    return Exists(models.TitleGenre.objects.filter(
+        title=OuterRef('pk'), genre__slug__in=slugs
+    ))
 
 
 class TitleFilter(rest_framework.FilterSet):
     """Фильтр для Произведений.
-    Доступен фильтр по жанру, категории, названию и году.
+    genre и category принимают слаги через запятую и оставляют
+    произведения хотя бы с одним из них, genre_all — со всеми жанрами
+    сразу. year_min и year_max задают диапазон лет.
+    Доступен фильтр по названию и году.
+    Параметр search ищет по названию с сортировкой по релевантности.
     """
-    genre = rest_framework.CharFilter(field_name='genre__slug')
-    category = rest_framework.CharFilter(field_name='category__slug')
+    genre = rest_framework.CharFilter(method='filter_genre')
+    genre_all = rest_framework.CharFilter(method='filter_genre_all')
+    category = rest_framework.CharFilter(method='filter_category')
     name = rest_framework.CharFilter(
         field_name='name', lookup_expr='icontains')
     year = rest_framework.NumberFilter(field_name='year')
+    year_min = rest_framework.NumberFilter(
+        field_name='year', lookup_expr='gte')
+    year_max = rest_framework.NumberFilter(
+        field_name='year', lookup_expr='lte')
+    search = rest_framework.CharFilter(method='filter_search')
 
     class Meta:
         model = models.Title
-        fields = ['genre', 'category', 'name', 'year']
+        fields = [
+            'genre', 'genre_all', 'category', 'name',
+            'year', 'year_min', 'year_max', 'search'
+        ]
+
+    def filter_genre(self, queryset, name, value):
+        return queryset.filter(has_genres(split_slugs(value)))
+
+    def filter_genre_all(self, queryset, name, value):
+        for slug in set(split_slugs(value)):
+            queryset = queryset.filter(has_genres([slug]))
+        return queryset
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(category__slug__in=split_slugs(value))
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+class TitleOrderingFilter(filters.OrderingFilter):
+    """Сортировка произведений параметром ordering.
+    Доступные имена сопоставлены накопленным индексированным полям
+    произведения, у произведения без оценок рейтинг считается нулевым.
+    Равные значения упорядочиваются по id в том же направлении,
+    пустые даты идут в конце. Без параметра порядок не меняется.
+    """
+    ordering_fields = {
+        'rating': 'rating_avg',
+        'year': 'year',
+        'review_count': 'rating_count',
+        'last_review_at': 'last_review_at',
+    }
+
+    def get_valid_fields(self, queryset, view, context={}):
+        return [(name, name) for name in self.ordering_fields]
+
+    def get_order_by(self, queryset, term):
+        name = term.lstrip('-')
+        column = self.ordering_fields.get(name, name)
+        nulls_last = queryset.model._meta.get_field(column).null
+        if term.startswith('-'):
+            return F(column).desc(nulls_last=nulls_last)
+        return F(column).asc(nulls_last=nulls_last)
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        tiebreaker = '-id' if ordering[0].startswith('-') else 'id'
+        return queryset.order_by(*(
+            self.get_order_by(queryset, term)
+            for term in (*ordering, tiebreaker)
+        ))
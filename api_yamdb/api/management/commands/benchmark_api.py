@@ -0,0 +1,128 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from api.benchmark import ENDPOINTS, PERCENTILES, compare, run_benchmark
+from reviews.models import Review
+from reviews.synthetic import SyntheticDataset, parse_scale
+
+
+class Command(BaseCommand):
+    help = (
+        'seeds a synthetic dataset into a test database and measures '
+        'latency, query count and response size of the API endpoints'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', default='10k',
+            help='number of reviews in the dataset, e.g. 10k, 100k, 1m'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument(
+            '--endpoint', action='append', dest='endpoints',
+            choices=[name for name, path, params in ENDPOINTS],
+            help='measure only this endpoint (can be repeated)'
+        )
+        parser.add_argument('--output', help='write results to a JSON file')
+        parser.add_argument(
+            '--baseline', help='compare results with this JSON file'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='allowed growth of p95 and bytes against the baseline'
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='exit with an error if the baseline comparison fails'
+        )
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='keep the test database and reuse its dataset'
+        )
+
+    def seed(self, scale, seed):
+        if Review.objects.exists():
+            self.stdout.write('Using the existing dataset')
+            return
+        start = time.perf_counter()
+        counts = SyntheticDataset(scale, seed).generate()
+        self.stdout.write(
+            'Seeded {} in {:.1f}s'.format(
+                ', '.join(f'{count} {name}' for name, count in counts.items()),
+                time.perf_counter() - start
+            )
+        )
+
+    def write_results(self, results):
+        columns = [f'p{percentile}' for percentile in PERCENTILES]
+        self.stdout.write('{:<18}{:>7}'.format('endpoint', 'status') + ''.join(
+            f'{column + " ms":>11}' for column in columns
+        ) + '{:>9}{:>11}'.format('queries', 'bytes'))
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<18}{result["status"]:>7}'
+                + ''.join(f'{result[column]:>11.2f}' for column in columns)
+                + f'{result["queries"]:>9}{result["bytes"]:>11}'
+            )
+
+    def handle(self, *args, **options):
+        try:
+            scale = parse_scale(options['scale'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False,
+            keepdb=options['keepdb']
+        )
+        try:
+            self.seed(scale, options['seed'])
+            results = run_benchmark(
+                options['iterations'], options['warmup'],
+                options['endpoints']
+            )
+            reviews = Review.objects.count()
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb']
+            )
+            teardown_test_environment()
+        self.write_results(results)
+        report = {
+            'reviews': reviews,
+            'seed': options['seed'],
+            'vendor': connection.vendor,
+            'iterations': options['iterations'],
+            'endpoints': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        if options['baseline']:
+            self.check_baseline(report, options)
+
+    def check_baseline(self, report, options):
+        with open(options['baseline'], encoding='utf-8') as file:
+            baseline = json.load(file)
+        if baseline.get('reviews') != report['reviews']:
+            self.stdout.write(self.style.WARNING(
+                f'Baseline has {baseline.get("reviews")} reviews, '
+                f'this run has {report["reviews"]}'
+            ))
+        regressions = compare(
+            report['endpoints'], baseline['endpoints'], options['tolerance']
+        )
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(regression))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('No regressions'))
+        elif options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} regressions found')
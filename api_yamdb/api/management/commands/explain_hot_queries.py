@@ -0,0 +1,104 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory
+
+from api.benchmark import API_URL, get_samples
+
+# Самые частые запросы клиентов: название, путь и параметры.
+HOT_QUERIES = (
+    ('titles', '/titles/', {}),
+    ('titles by category and years', '/titles/', {
+        'category': '{category}', 'year_min': 1900, 'year_max': 2000
+    }),
+    ('titles by genre', '/titles/', {'genre': '{genre}'}),
+    ('titles by rating', '/titles/', {'ordering': '-rating'}),
+    ('titles top', '/titles/top/', {'category': '{category}'}),
+    ('title', '/titles/{title}/', {}),
+    ('reviews', '/titles/{title}/reviews/', {}),
+    ('review', '/titles/{title}/reviews/{review}/', {}),
+    ('comments', '/titles/{title}/reviews/{review}/comments/', {}),
+    ('comment', '/titles/{title}/reviews/{review}/comments/{comment}/', {}),
+)
+SEQ_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\S+)'),
+    'sqlite': re.compile(r'^SCAN (\S+)$'),
+}
+
+
+def capture_queries(path, params):
+    """Выполняет GET через представление API и возвращает его SELECT."""
+    request = APIRequestFactory().get(API_URL + path, params)
+    match = resolve(API_URL + path)
+    with CaptureQueriesContext(connection) as context:
+        match.func(request, *match.args, **match.kwargs).render()
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+    ]
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+        return [str(row[-1]) for row in cursor.fetchall()]
+
+
+class Command(BaseCommand):
+    help = (
+        'runs EXPLAIN on the queries of the hot API endpoints '
+        'and flags sequential scans'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='PostgreSQL: disable seq scans in the planner, so a '
+                 'remaining seq scan means there is no usable index'
+        )
+        parser.add_argument(
+            '--fail-on-seq-scan',
+            action='store_true',
+            help='exit with an error if any query uses a seq scan'
+        )
+
+    def handle(self, *args, **options):
+        pattern = SEQ_SCAN_PATTERNS.get(connection.vendor)
+        samples = get_samples()
+        total = flagged = 0
+        with transaction.atomic():
+            if options['strict'] and connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            for name, path, params in HOT_QUERIES:
+                queries = capture_queries(path.format(**samples), {
+                    key: str(value).format(**samples)
+                    for key, value in params.items()
+                })
+                self.stdout.write(f'{name}: {len(queries)} queries')
+                for sql in queries:
+                    plan = explain(sql)
+                    tables = [
+                        match.group(1) for match in map(
+                            pattern.search, plan
+                        ) if match
+                    ] if pattern else []
+                    total += 1
+                    flagged += bool(tables)
+                    status = (
+                        self.style.WARNING(f'SEQ SCAN {", ".join(tables)}')
+                        if tables else 'ok'
+                    )
+                    self.stdout.write(f'  {status}: {sql[:120]}')
+                    if options['verbosity'] > 1:
+                        for line in plan:
+                            self.stdout.write(f'      {line}')
+        self.stdout.write(
+            f'{flagged} of {total} queries use sequential scans'
+        )
+        if flagged and options['fail_on_seq_scan']:
+            raise CommandError('Sequential scans found in hot queries')
@@ -0,0 +1,407 @@
+import fcntl
+import hmac
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+from api_yamdb.db_pool.pool import get_pool_stats
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+FAMILIES = {
+    'http_requests_total': (
+        'counter', 'Responses by view, method and status.'
+    ),
+    'http_request_duration_seconds': (
+        'histogram', 'Request latency by view and method.'
+    ),
+    'http_request_db_queries': (
+        'histogram', 'SQL queries per request by view and method.'
+    ),
+    'http_requests_in_flight': (
+        'gauge', 'Requests being processed right now.'
+    ),
+    'db_pool_max_connections': (
+        'gauge', 'Connection limit of the database pools.'
+    ),
+    'db_pool_connections': ('gauge', 'Open pooled connections by state.'),
+    'db_pool_checkouts_total': ('counter', 'Connections taken from pools.'),
+    'db_pool_connects_total': ('counter', 'New database connections.'),
+    'db_pool_failed_checks_total': (
+        'counter', 'Pooled connections that failed the health check.'
+    ),
+    'db_pool_timeouts_total': (
+        'counter', 'Checkouts that waited longer than the pool timeout.'
+    ),
+    'db_pool_wait_seconds_total': (
+        'counter', 'Time spent waiting for pooled connections.'
+    ),
+}
+# Статистика пулов соединений: значение, метрика и ее метки.
+POOL_METRICS = {
+    'max_size': ('db_pool_max_connections', {}),
+    'idle': ('db_pool_connections', {'state': 'idle'}),
+    'in_use': ('db_pool_connections', {'state': 'in_use'}),
+    'checkouts': ('db_pool_checkouts_total', {}),
+    'connects': ('db_pool_connects_total', {}),
+    'failed_checks': ('db_pool_failed_checks_total', {}),
+    'timeouts': ('db_pool_timeouts_total', {}),
+    'wait_seconds': ('db_pool_wait_seconds_total', {}),
+}
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+HEADER = struct.Struct('<Q')
+LENGTH = struct.Struct('<I')
+VALUE = struct.Struct('<d')
+INITIAL_SIZE = 64 * 1024
+# Счетчики завершенных процессов, перенесенные из их файлов.
+MERGED_COUNTERS = 'counter_merged.db'
+LOCK_FILE = 'collect.lock'
+
+
+def align(offset):
+    return (offset + 7) // 8 * 8
+
+
+def parse_values(data):
+    """Пары (ключ, смещение значения, значение) из содержимого файла."""
+    used = min(HEADER.unpack_from(data)[0], len(data))
+    position = HEADER.size
+    while position + LENGTH.size <= used:
+        length = LENGTH.unpack_from(data, position)[0]
+        key_start = position + LENGTH.size
+        offset = align(key_start + length)
+        if offset + VALUE.size > used:
+            break
+        key = bytes(data[key_start:key_start + length]).decode()
+        yield key, offset, VALUE.unpack_from(data, offset)[0]
+        position = offset + VALUE.size
+
+
+class MmapValues:
+    """Числа по строковым ключам в файле, отображенном в память.
+    Пишет только процесс-владелец файла: новая запись сначала
+    заполняется, затем сдвигается счетчик занятых байт в заголовке,
+    поэтому другие процессы читают файл без блокировок.
+    """
+
+    def __init__(self, path, reset=False):
+        flags = os.O_RDWR | os.O_CREAT | (os.O_TRUNC if reset else 0)
+        self.fd = os.open(path, flags)
+        self.lock = threading.Lock()
+        size = os.fstat(self.fd).st_size
+        if size < INITIAL_SIZE:
+            os.ftruncate(self.fd, INITIAL_SIZE)
+        self.memory = mmap.mmap(self.fd, max(size, INITIAL_SIZE))
+        if size == 0:
+            HEADER.pack_into(self.memory, 0, HEADER.size)
+        self.offsets = {
+            key: offset for key, offset, _ in parse_values(self.memory)
+        }
+
+    def grow(self, end):
+        size = len(self.memory)
+        while size < end:
+            size *= 2
+        self.memory.close()
+        os.ftruncate(self.fd, size)
+        self.memory = mmap.mmap(self.fd, size)
+
+    def add(self, key):
+        encoded = key.encode()
+        used = HEADER.unpack_from(self.memory)[0]
+        offset = align(used + LENGTH.size + len(encoded))
+        end = offset + VALUE.size
+        if end > len(self.memory):
+            self.grow(end)
+        LENGTH.pack_into(self.memory, used, len(encoded))
+        start = used + LENGTH.size
+        self.memory[start:start + len(encoded)] = encoded
+        VALUE.pack_into(self.memory, offset, 0.0)
+        HEADER.pack_into(self.memory, 0, end)
+        self.offsets[key] = offset
+        return offset
+
+    def inc(self, key, amount=1):
+        with self.lock:
+            offset = self.offsets.get(key)
+            if offset is None:
+                offset = self.add(key)
+            value = VALUE.unpack_from(self.memory, offset)[0]
+            VALUE.pack_into(self.memory, offset, value + amount)
+
+    def set(self, key, value):
+        with self.lock:
+            offset = self.offsets.get(key)
+            if offset is None:
+                offset = self.add(key)
+            VALUE.pack_into(self.memory, offset, value)
+
+    def close(self):
+        self.memory.close()
+        os.close(self.fd)
+
+
+def sample_key(family, suffix='', **labels):
+    return json.dumps([family, suffix, sorted(labels.items())])
+
+
+class MetricsStore:
+    """Файлы одного процесса: счетчики и гистограммы копятся и после
+    его завершения, значения gauge учитываются только у живых
+    процессов.
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        pid = os.getpid()
+        self.counters = MmapValues(
+            os.path.join(directory, f'counter_{pid}.db')
+        )
+        self.gauges = MmapValues(
+            os.path.join(directory, f'gauge_{pid}.db'), reset=True
+        )
+
+    def observe(self, family, buckets, value, **labels):
+        for bucket in buckets:
+            if value <= bucket:
+                self.counters.inc(
+                    sample_key(family, '_bucket', le=str(bucket), **labels)
+                )
+        self.counters.inc(sample_key(family, '_bucket', le='+Inf', **labels))
+        self.counters.inc(sample_key(family, '_sum', **labels), value)
+        self.counters.inc(sample_key(family, '_count', **labels))
+
+    def publish_pool_stats(self):
+        """Статистика пулов процесса живет, пока жив процесс,
+        поэтому хранится вместе с gauge.
+        """
+        for pool, stats in get_pool_stats().items():
+            for name, value in stats.items():
+                family, labels = POOL_METRICS[name]
+                self.gauges.set(
+                    sample_key(family, pool=pool, **labels), value
+                )
+
+
+stores = {}
+stores_lock = threading.Lock()
+
+
+def get_metrics_dir():
+    directory = settings.METRICS['DIR']
+    if not directory:
+        raise ImproperlyConfigured(
+            'METRICS_DIR must be set when METRICS is enabled'
+        )
+    return directory
+
+
+def get_store():
+    """Хранилище текущего процесса, после fork создается новое."""
+    key = (get_metrics_dir(), os.getpid())
+    with stores_lock:
+        if key not in stores:
+            stores[key] = MetricsStore(key[0])
+        return stores[key]
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def list_process_files(directory):
+    """Файлы процессов: (вид, pid, путь)."""
+    for name in os.listdir(directory):
+        kind, _, rest = name.partition('_')
+        try:
+            pid = int(rest.split('.')[0])
+        except ValueError:
+            continue
+        yield kind, pid, os.path.join(directory, name)
+
+
+def read_values(path):
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        return []
+    return [(key, value) for key, _, value in parse_values(data)]
+
+
+def prune_dead(directory):
+    """Переносит счетчики завершенных процессов в MERGED_COUNTERS
+    и удаляет их файлы, чтобы папка не росла с каждым перезапуском
+    воркеров. Вызывается под блокировкой LOCK_FILE.
+    """
+    merged = None
+    for kind, pid, path in list(list_process_files(directory)):
+        if is_alive(pid):
+            continue
+        if kind == 'counter':
+            if merged is None:
+                merged = MmapValues(os.path.join(directory, MERGED_COUNTERS))
+            for key, value in read_values(path):
+                merged.inc(key, value)
+        os.remove(path)
+    if merged is not None:
+        merged.close()
+
+
+def collect(directory):
+    """Суммирует значения из файлов всех процессов. Перенос файлов
+    завершенных процессов и чтение идут под одной блокировкой,
+    чтобы одновременные запросы не посчитали счетчики дважды.
+    """
+    totals = defaultdict(float)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_FILE), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        prune_dead(directory)
+        paths = [path for _, _, path in list_process_files(directory)]
+        merged = os.path.join(directory, MERGED_COUNTERS)
+        if os.path.exists(merged):
+            paths.append(merged)
+        for path in paths:
+            for key, value in read_values(path):
+                totals[key] += value
+    return totals
+
+
+def escape(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace(
+        '\n', r'\n'
+    )
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{escape(value)}"' for name, value in labels
+    ) + '}'
+
+
+def sample_order(sample):
+    suffix, labels, _ = sample
+    le = dict(labels).get('le')
+    return (
+        [label for label in labels if label[0] != 'le'],
+        suffix,
+        float(le) if le else 0,
+    )
+
+
+def render(totals):
+    """Текстовый формат Prometheus."""
+    families = defaultdict(list)
+    for key, value in totals.items():
+        family, suffix, labels = json.loads(key)
+        families[family].append((suffix, labels, value))
+    lines = []
+    for family in sorted(families):
+        kind, description = FAMILIES.get(family, ('untyped', ''))
+        lines.append(f'# HELP {family} {description}')
+        lines.append(f'# TYPE {family} {kind}')
+        for suffix, labels, value in sorted(
+            families[family], key=sample_order
+        ):
+            lines.append(
+                f'{family}{suffix}{format_labels(labels)} {float(value)!r}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def is_authorized(request):
+    token = settings.METRICS.get('TOKEN')
+    if not token:
+        return True
+    return hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    )
+
+
+def metrics_view(request):
+    if not settings.METRICS['ENABLED']:
+        raise Http404
+    if not is_authorized(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render(collect(get_metrics_dir())), content_type=CONTENT_TYPE
+    )
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """Считает ответы, задержки, SQL-запросы и запросы в обработке
+    по представлениям в хранилище процесса для metrics_view.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS['ENABLED']:
+            raise MiddlewareNotUsed
+        get_metrics_dir()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        store = get_store()
+        in_flight = sample_key('http_requests_in_flight')
+        queries = QueryCounter()
+        store.gauges.inc(in_flight)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(queries)
+                    )
+                response = self.get_response(request)
+        finally:
+            store.gauges.inc(in_flight, -1)
+        duration = time.perf_counter() - start
+        match = request.resolver_match
+        labels = {
+            'view': match.view_name if match else 'unmatched',
+            'method': request.method if request.method in METHODS
+            else 'other',
+        }
+        store.counters.inc(sample_key(
+            'http_requests_total', status=str(response.status_code), **labels
+        ))
+        store.observe(
+            'http_request_duration_seconds', DURATION_BUCKETS, duration,
+            **labels
+        )
+        store.observe(
+            'http_request_db_queries', QUERY_BUCKETS, queries.count, **labels
+        )
+        store.publish_pool_stats()
+        return response
@@ -0,0 +1,57 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class TitleCursorPagination(CursorPagination):
+    """Курсорная пагинация произведений по id.
+    Параметр ordering в курсорном режиме не учитывается.
+    """
+    ordering = ('id',)
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Курсорная пагинация отзывов и комментариев по (pub_date, id)."""
+    ordering = ('-pub_date', '-id')
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+
+class CursorOrLimitOffsetPagination(LimitOffsetPagination):
+    """Пагинация limit/offset с курсорным режимом по запросу.
+    Курсорный режим включается параметром cursor (пустое значение
+    открывает первую страницу), размер страницы в нем ограничен
+    max_page_size курсорного пагинатора.
+    """
+    cursor_pagination_class = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        cursor_param = self.cursor_pagination_class.cursor_query_param
+        if cursor_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+
+class TitlePagination(CursorOrLimitOffsetPagination):
+    cursor_pagination_class = TitleCursorPagination
+
+
+class PubDatePagination(CursorOrLimitOffsetPagination):
+    cursor_pagination_class = PubDateCursorPagination
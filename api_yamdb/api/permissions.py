@@ -11,11 +11,15 @@ class ObjectReadOnly(permissions.BasePermission):
 class AuthorOrReadOnly(ObjectReadOnly):
     """
     Изменять и удалять объект может его автор, модератор или админ.
+    Автор сравнивается по author_id, без загрузки пользователя.
     """
     def has_object_permission(self, request, view, obj):
         user = request.user
         if user.is_authenticated:
-            return user == obj.author or user.is_admin or user.is_moderator
+            return (
+                obj.author_id == user.pk
+                or user.is_admin or user.is_moderator
+            )
         return super().has_object_permission(request, view, obj)
 
 
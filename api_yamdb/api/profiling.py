@@ -0,0 +1,144 @@
+import json
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('api.profiling')
+
+
+def to_ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+class RequestProfile:
+    """Замеры одного запроса. Подключается к соединениям через
+    execute_wrapper и собирает количество и время SQL-запросов
+    по их тексту: один текст много раз подряд — признак N+1.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.end = None
+        self.db_time = 0.0
+        self.view_marks = []
+        self.query_counts = Counter()
+        self.query_times = defaultdict(float)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.db_time += duration
+            self.query_counts[sql] += 1
+            self.query_times[sql] += duration
+
+    def mark(self):
+        """Отмечает начало и конец работы представления."""
+        self.view_marks.append((time.perf_counter(), self.db_time))
+
+    def finish(self):
+        self.end = time.perf_counter()
+
+    @property
+    def queries(self):
+        return sum(self.query_counts.values())
+
+    @property
+    def duplicates(self):
+        return sum(
+            count - 1 for count in self.query_counts.values() if count > 1
+        )
+
+    def get_timings(self):
+        """Длительности в миллисекундах: total — весь запрос, db — SQL,
+        app — представление с сериализаторами без SQL, render — отрисовка
+        ответа рендерером без SQL.
+        """
+        timings = {'total': self.end - self.start, 'db': self.db_time}
+        if len(self.view_marks) == 2:
+            (view_start, db_start), (view_end, db_end) = self.view_marks
+            timings['app'] = view_end - view_start - (db_end - db_start)
+            timings['render'] = (
+                self.end - view_end - (self.db_time - db_end)
+            )
+        return {name: to_ms(value) for name, value in timings.items()}
+
+    def get_top_queries(self, limit):
+        top = sorted(
+            self.query_times.items(), key=lambda item: item[1], reverse=True
+        )[:limit]
+        return [{
+            'sql': sql,
+            'count': self.query_counts[sql],
+            'ms': to_ms(duration),
+        } for sql, duration in top]
+
+    def server_timing(self):
+        timings = self.get_timings()
+        parts = [
+            f'db;dur={timings.pop("db")};desc="{self.queries} queries, '
+            f'{self.duplicates} duplicates"'
+        ]
+        parts.extend(f'{name};dur={value}' for name, value in timings.items())
+        return ', '.join(parts)
+
+
+class ProfilingMiddleware:
+    """Профилирование запросов: заголовок Server-Timing с временем
+    запроса, SQL, представления и отрисовки и запись медленных
+    запросов с их самыми долгими SQL-запросами в журнал api.profiling.
+    Медленные запросы пишутся с вероятностью SAMPLE_RATE. Выключенное
+    в settings.PROFILING не подключается к обработке запросов.
+    """
+
+    def __init__(self, get_response):
+        config = settings.PROFILING
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_request_ms = config['SLOW_REQUEST_MS']
+        self.sample_rate = config['SAMPLE_RATE']
+        self.top_queries = config['TOP_QUERIES']
+
+    def __call__(self, request):
+        profile = request.profile = RequestProfile()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(profile)
+                )
+            response = self.get_response(request)
+        profile.finish()
+        response['Server-Timing'] = profile.server_timing()
+        self.log_slow_request(request, response, profile)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.profile.mark()
+
+    def process_template_response(self, request, response):
+        request.profile.mark()
+        return response
+
+    def log_slow_request(self, request, response, profile):
+        timings = profile.get_timings()
+        if (timings['total'] < self.slow_request_ms
+                or random.random() >= self.sample_rate):
+            return
+        logger.warning(json.dumps({
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            **timings,
+            'queries': profile.queries,
+            'duplicates': profile.duplicates,
+            'top_queries': profile.get_top_queries(self.top_queries),
+        }, ensure_ascii=False))
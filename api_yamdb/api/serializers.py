@@ -1,13 +1,17 @@
 from datetime import datetime
 
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from rest_framework import serializers, status
+from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from reviews import models
+from users.authentication import add_role_claims, set_user_version
 from users.models import User
 
+from .bulk import BulkListSerializer, BulkSlugRelatedField
+
 
 class UserCreateSerializer(serializers.ModelSerializer):
     """Сериализатор создания пользователя.
@@ -49,9 +53,16 @@ class CustomTokenObtainSerializer(serializers.ModelSerializer):
         fields = ('confirmation_code', 'username', )
 
     def get_token(self, user):
-        """Функция создания токена."""
+        """Функция создания токена.
+        С JWT_ROLE_CLAIMS в токен добавляются роль и версия прав,
+        а версия сразу кладется в кэш для проверки токена.
+        """
         refresh = RefreshToken.for_user(user)
-        return {'access': str(refresh.access_token), }
+        access = refresh.access_token
+        if settings.JWT_ROLE_CLAIMS['ENABLED']:
+            add_role_claims(access, user)
+            set_user_version(user.pk, user.token_version)
+        return {'access': str(access), }
 
     def validate(self, attrs):
         username = attrs['username']
@@ -94,10 +105,18 @@ class GenreSerializer(serializers.ModelSerializer):
 
 
 class TitleReadSerializer(serializers.ModelSerializer):
-    """Сериализатор для чтения данных произведений."""
+    """Сериализатор для чтения данных произведений.
+    Статистика отзывов берется из накопленных полей произведения.
+    """
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
     rating = serializers.IntegerField(read_only=True, required=False)
+    review_count = serializers.IntegerField(read_only=True)
+    scores = serializers.DictField(
+        source='score_histogram',
+        child=serializers.IntegerField(),
+        read_only=True
+    )
 
     class Meta:
         model = models.Title
@@ -108,16 +127,20 @@ class TitleReadSerializer(serializers.ModelSerializer):
             'description',
             'genre',
             'category',
-            'rating')
+            'rating',
+            'review_count',
+            'scores',
+            'comment_count',
+            'last_review_at')
 
 
 class TitleWriteSerializer(serializers.ModelSerializer):
     """Сериализатор для записи и изменения данных произведений."""
-    category = serializers.SlugRelatedField(
+    category = BulkSlugRelatedField(
         queryset=models.Category.objects.all(),
         slug_field='slug'
     )
-    genre = serializers.SlugRelatedField(
+    genre = BulkSlugRelatedField(
         queryset=models.Genre.objects.all(),
         many=True,
         slug_field='slug'
@@ -132,6 +155,7 @@ class TitleWriteSerializer(serializers.ModelSerializer):
             'description',
             'genre',
             'category')
+        list_serializer_class = BulkListSerializer
 
     def validate_year(self, value):
         if value > datetime.today().year:
@@ -142,42 +166,23 @@ class TitleWriteSerializer(serializers.ModelSerializer):
 
 
 class ReviewSerializer(serializers.ModelSerializer):
-    """Сериализатор для чтения и изменения данных отзыва."""
-    author = serializers.StringRelatedField(
-        read_only=True,
-        default=serializers.CurrentUserDefault()
-    )
-    title = serializers.HiddenField(default=TitleReadSerializer)
+    """Сериализатор для чтения и изменения данных отзыва.
+    Повторный отзыв отклоняет ограничение unique_title_review в базе,
+    ошибку переводит в 400 ReviewViewSet.
+    """
+    author = serializers.StringRelatedField(read_only=True)
 
     class Meta:
         model = models.Review
-        fields = ('id', 'text', 'author', 'title', 'score', 'pub_date')
-        validators = [
-            serializers.UniqueTogetherValidator(
-                queryset=models.Review.objects.all(),
-                fields=['title', 'author'],
-                message='вы уже оставляли отзыв'
-            )
-        ]
-
-    def validate(self, attrs):
-        request = self.context['request']
-        user = request.user
-        title = request.parser_context['kwargs']['title_id']
-        review = models.Review.objects.filter(title=title, author=user)
-        if review.exists() and request.method == 'POST':
-            raise serializers.ValidationError(
-                detail='Нельзя оставлять больше одного отзыва на произведение',
-                code=status.HTTP_400_BAD_REQUEST
-            )
-        return attrs
+        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        list_serializer_class = BulkListSerializer
 
 
 class CommentSerializer(serializers.ModelSerializer):
     """Сериализатор для чтения и изменения данных комментария."""
     author = serializers.StringRelatedField(read_only=True)
-    review = serializers.HiddenField(default=ReviewSerializer)
 
     class Meta:
         model = models.Comment
-        fields = ('id', 'text', 'author', 'review', 'pub_date')
+        fields = ('id', 'text', 'author', 'pub_date')
+        list_serializer_class = BulkListSerializer
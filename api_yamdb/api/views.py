@@ -1,32 +1,43 @@
 import rest_framework.permissions as rest_permissions
-from django.conf import settings
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import (filters, generics, mixins, response, status,
-                            viewsets)
+from rest_framework import (exceptions, filters, generics, mixins, response,
+                            status, viewsets)
 from rest_framework.decorators import action
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.settings import api_settings
 
 from reviews import models
+from reviews.export import EXPORT_FORMATS, export_catalog
+from users.mail import send_confirmation_code
 from users.models import User
 
 from . import permissions, serializers
-from .filters import TitleFilter
+from .bulk import BulkCreateMixin, is_unique_violation
+from .cache import VersionedListCacheMixin
+from .conditional import ConditionalGetMixin
+from .filters import TitleFilter, TitleOrderingFilter
+from .pagination import PubDatePagination, TitlePagination
 
 
 class ListCreateDestroyViewSet(
+        VersionedListCacheMixin,
         mixins.ListModelMixin,
         mixins.CreateModelMixin,
         mixins.DestroyModelMixin,
         viewsets.GenericViewSet):
-    """Кастомный класс для чтения, создания и удаления объектов."""
+    """Кастомный класс для чтения, создания и удаления объектов.
+    Ответы списка кэшируются до следующего создания или удаления.
+    """
     pass
 
 
 class UserCreateViewSet(generics.CreateAPIView):
     """Представление для создания пользователя. Имеет только POST запрос.
+    Письмо с кодом подтверждения отправляется в фоне.
     """
     permission_classes = (rest_permissions.AllowAny,)
     serializer_class = serializers.UserCreateSerializer
@@ -42,14 +53,7 @@ class UserCreateViewSet(generics.CreateAPIView):
             username=serializer.data['username']
         )
 
-        send_mail(
-            'Добро пожаловать на YaMDB',
-            f'Дорогой {user.username},\n'
-            f'Ваш confirmation_code: {user.confirmation_code}',
-            settings.POST_EMAIL,
-            [f'{user.email}'],
-            fail_silently=False,
-        )
+        send_confirmation_code(user)
 
         return response.Response(
             data={
@@ -110,6 +114,8 @@ class UserViewSet(viewsets.ModelViewSet):
     def me(self, request):
         """Доступ пользователя к своей учетной записи по '/users/me/'."""
         me_user = request.user
+        if me_user.get_deferred_fields():
+            me_user = User.objects.get(pk=me_user.pk)
         serializer = self.get_serializer(me_user)
         if request.method == "PATCH":
             serializer = self.get_serializer(
@@ -151,80 +157,215 @@ class GenreViewSet(ListCreateDestroyViewSet):
     search_fields = ('name',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+        BulkCreateMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """Вьюсет Произведения.
     Реализованы методы чтения, создания,
     частичного обновления и удаления объектов.
     Есть фильтр по полям slug категории/жанра, названию, году.
+    Параметр ordering сортирует по rating, year, review_count
+    и last_review_at, '/titles/top/' отдает лидерборд по рейтингу.
+    Параметр cursor включает курсорную пагинацию по id.
+    Поддерживаются условные запросы: ETag у списка и ETag
+    с Last-Modified у произведения.
+    POST с массивом создает несколько произведений разом.
     """
-    queryset = models.Title.objects.annotate(rating=Avg("reviews__score"))
+    queryset = models.Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     permission_classes = (permissions.AdminOrReadOnly, )
-    pagination_class = LimitOffsetPagination
-    filter_backends = [DjangoFilterBackend]
+    pagination_class = TitlePagination
+    filter_backends = [DjangoFilterBackend, TitleOrderingFilter]
     filterset_class = TitleFilter
+    top_size = 10
+    top_max_size = 100
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'top'):
             return serializers.TitleReadSerializer
         return serializers.TitleWriteSerializer
 
+    def get_top_size(self):
+        try:
+            size = int(self.request.query_params['limit'])
+        except (KeyError, ValueError):
+            return self.top_size
+        if size <= 0:
+            return self.top_size
+        return min(size, self.top_max_size)
+
+    @action(detail=False, methods=['get'], url_path='top', url_name='top')
+    def top(self, request):
+        """Лидерборд по '/titles/top/': произведения с оценками
+        по убыванию рейтинга. Фильтры списка (category, genre, year)
+        сужают его до категории или жанра, limit задает размер.
+        Рейтинг обновляется при каждой записи отзыва, поэтому выборка
+        идет по индексу без агрегатов.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            rating_count__gt=0
+        ).order_by('-rating_avg', '-id')[:self.get_top_size()]
+        serializer = self.get_serializer(queryset, many=True)
+        return response.Response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='export',
+        url_name='export',
+        permission_classes=(permissions.AdminOnly,),
+    )
+    def export(self, request):
+        """Потоковая выгрузка всего каталога по '/titles/export/'.
+        Параметры: output=ndjson|csv, reviews=1 для отзывов и комментариев.
+        """
+        export_format = request.query_params.get('output', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return response.Response(
+                {'output': f'Допустимые форматы: {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        include_reviews = request.query_params.get('reviews') in ('1', 'true')
+        content_type = (
+            'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+        )
+        export_response = StreamingHttpResponse(
+            export_catalog(export_format, include_reviews),
+            content_type=f'{content_type}; charset=utf-8'
+        )
+        export_response['Content-Disposition'] = (
+            f'attachment; filename="catalog.{export_format}"'
+        )
+        return export_response
+
+    def get_list_validator(self):
+        """Только ETag по id и времени изменения произведений страницы
+        и их общему количеству: его меняет добавление, удаление
+        и любое изменение показанных произведений. Last-Modified
+        по Max('modified') не заметил бы удаления. Страница
+        загружается здесь один раз, жанры — только для ответа 200.
+        """
+        self._page = self.paginate_queryset(
+            self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        )
+        return None, (
+            getattr(self.paginator, 'count', None),
+            [(title.pk, title.modified) for title in self._page]
+        )
+
+    def paginate_queryset(self, queryset):
+        if not hasattr(self, '_page'):
+            return super().paginate_queryset(queryset)
+        prefetch_related_objects(self._page, 'genre')
+        return self._page
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def get_object_validator(self):
+        last_modified = models.Title.objects.filter(
+            pk=self.kwargs['pk']
+        ).values_list('modified', flat=True).first()
+        if last_modified is None:
+            return None
+        return last_modified, None
+
+
+class ReviewViewSet(
+        BulkCreateMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """Вьюсет Отзывы.
     Реализованы методы чтения, создания,
     частичного обновления и удаления объектов.
+    Параметр cursor включает курсорную пагинацию по (pub_date, id).
+    Список поддерживает условные запросы (ETag, Last-Modified).
+    POST с массивом создает несколько объектов разом.
     """
     serializer_class = serializers.ReviewSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = PubDatePagination
     permission_classes = (
         rest_permissions.IsAuthenticatedOrReadOnly,
         permissions.AuthorOrReadOnly
     )
 
+    def get_list_validator(self):
+        last_modified = models.Title.objects.filter(
+            pk=self.kwargs.get('title_id')
+        ).values_list('modified', flat=True).first()
+        if last_modified is None:
+            return None
+        return last_modified, None
+
+    def get_title(self):
+        """Произведение из URL, загружается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                models.Title, pk=self.kwargs.get('title_id')
+            )
+        return self._title
+
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(models.Title, pk=title_id)
-        return title.reviews.all()
+        return self.get_title().reviews.select_related('author').order_by(
+            '-pub_date', '-id'
+        )
 
     def perform_create(self, serializer):
         """
         Поля author и title заполняются из данных запроса.
+        Повторный отзыв отклоняет ограничение unique_title_review.
         """
-        serializer.save(
-            author=self.request.user,
-            title=get_object_or_404(
-                models.Title,
-                pk=self.kwargs.get('title_id')
-            )
-        )
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        try:
+            with transaction.atomic():
+                serializer.save(
+                    author=self.request.user, title=self.get_title()
+                )
+        except IntegrityError as error:
+            if not is_unique_violation(error, 'unique_title_review'):
+                raise
+            raise exceptions.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Нельзя оставлять больше одного отзыва на произведение'
+                ]
+            })
+
+
+class CommentViewSet(
+        BulkCreateMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """Вьюсет Комментарии.
     Реализованы методы чтения, создания,
     частичного обновления и удаления объектов.
+    Параметр cursor включает курсорную пагинацию по (pub_date, id).
+    Список поддерживает условные запросы (ETag, Last-Modified).
+    POST с массивом создает несколько объектов разом.
     """
-    queryset = models.Comment.objects.all()
     serializer_class = serializers.CommentSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = PubDatePagination
     permission_classes = (
         rest_permissions.IsAuthenticatedOrReadOnly,
         permissions.AuthorOrReadOnly
     )
 
+    def get_list_validator(self):
+        last_modified = models.Review.objects.filter(
+            pk=self.kwargs.get('review_id')
+        ).values_list('modified', flat=True).first()
+        if last_modified is None:
+            return None
+        return last_modified, None
+
+    def get_review(self):
+        """Отзыв из URL, загружается один раз за запрос."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                models.Review,
+                pk=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+        return self._review
+
     def get_queryset(self):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(models.Review, pk=review_id)
-        return review.comments.all()
+        return self.get_review().comments.select_related(
+            'author'
+        ).order_by('-pub_date', '-id')
 
     def perform_create(self, serializer):
         """
         Поля author и review заполняются из данных запроса.
         """
-        serializer.save(
-            author=self.request.user,
-            review=get_object_or_404(
-                models.Review,
-                pk=self.kwargs.get('review_id')
-            )
-        )
+        serializer.save(author=self.request.user, review=self.get_review())
@@ -0,0 +1,52 @@
+"""PostgreSQL с пулом соединений в процессе.
+
+Подключается через ENGINE = 'api_yamdb.db_pool'. Django берет
+соединение из пула вместо открытия нового и возвращает его в пул
+вместо закрытия, размер пула и проверки задаются словарем POOL
+в настройках базы.
+"""
+from functools import partial
+
+from django.db.backends.postgresql import base, creation
+
+from .pool import PoolTimeout, close_pools, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Свободные соединения пула мешают удалить тестовую базу.
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_pool(self, conn_params):
+        options = self.settings_dict.get('POOL', {})
+        key = '{}:{}@{}:{}/{}'.format(
+            self.alias, conn_params.get('user', ''),
+            conn_params.get('host', ''), conn_params.get('port', ''),
+            conn_params.get('database', '')
+        )
+        return get_pool(
+            key,
+            max_size=options.get('MAX_SIZE', 4),
+            timeout=options.get('TIMEOUT', 5.0),
+            check_interval=options.get('CHECK_INTERVAL', 1.0),
+        )
+
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        try:
+            return self.pool.get(
+                partial(super().get_new_connection, conn_params)
+            )
+        except PoolTimeout as e:
+            raise base.Database.OperationalError(str(e))
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.put(self.connection)
@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from collections import Counter, deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Пул DB-API соединений одного процесса.
+    Держит не больше max_size открытых соединений: когда все заняты,
+    get ждет освобождения не дольше timeout. Соединение, простоявшее
+    без дела дольше check_interval секунд, перед выдачей проверяется
+    запросом SELECT 1, сломанное закрывается и заменяется новым.
+    """
+
+    def __init__(self, max_size=4, timeout=5.0, check_interval=1.0):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.idle = deque()
+        self.size = 0
+        self.condition = threading.Condition()
+        self.counters = Counter()
+
+    def reserve(self):
+        """Берет свободное соединение или место под новое (None)."""
+        deadline = time.monotonic() + self.timeout
+        with self.condition:
+            while not self.idle and self.size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f'No free connection in {self.timeout}s, '
+                        f'pool size is {self.max_size}'
+                    )
+                self.condition.wait(remaining)
+            if self.idle:
+                return self.idle.pop()
+            self.size += 1
+            return None
+
+    def get(self, connect):
+        """Выдает соединение, connect открывает новое."""
+        start = time.monotonic()
+        while True:
+            idle = self.reserve()
+            if idle is None:
+                connection = self.open(connect)
+                break
+            connection, returned_at = idle
+            if (time.monotonic() - returned_at < self.check_interval
+                    or self.is_healthy(connection)):
+                break
+            self.counters['failed_checks'] += 1
+            self.discard(connection)
+        self.counters['checkouts'] += 1
+        self.counters['wait_seconds'] += time.monotonic() - start
+        return connection
+
+    def open(self, connect):
+        try:
+            connection = connect()
+        except Exception:
+            self.release_slot()
+            raise
+        self.counters['connects'] += 1
+        return connection
+
+    def put(self, connection):
+        """Возвращает соединение, незавершенная транзакция
+        откатывается. Соединение с ошибкой закрывается.
+        """
+        try:
+            connection.rollback()
+        except Exception:
+            self.discard(connection)
+            return
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def is_healthy(self, connection):
+        if getattr(connection, 'closed', 0):
+            return False
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+            connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        self.release_slot()
+
+    def release_slot(self):
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def close_idle(self):
+        with self.condition:
+            idle, self.idle = self.idle, deque()
+        for connection, _ in idle:
+            self.discard(connection)
+
+    def get_stats(self):
+        with self.condition:
+            idle = len(self.idle)
+            return {
+                'max_size': self.max_size,
+                'idle': idle,
+                'in_use': self.size - idle,
+                **self.counters,
+            }
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(key, **options):
+    """Пул по ключу в текущем процессе, после fork создается новый."""
+    key = (os.getpid(), key)
+    with pools_lock:
+        if key not in pools:
+            pools[key] = ConnectionPool(**options)
+        return pools[key]
+
+
+def get_pool_stats():
+    """Статистика пулов текущего процесса по ключам."""
+    pid = os.getpid()
+    with pools_lock:
+        current = [
+            (key, pool) for (owner, key), pool in pools.items()
+            if owner == pid
+        ]
+    return {key: pool.get_stats() for key, pool in current}
+
+
+def close_pools():
+    """Закрывает свободные соединения всех пулов процесса."""
+    with pools_lock:
+        current = list(pools.values())
+    for pool in current:
+        pool.close_idle()
@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'django_filters',
@@ -35,6 +36,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,9 +77,69 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='127.0.0.1"'),
-        'PORT': os.getenv('DB_PORT', default=5432)
+        'PORT': os.getenv('DB_PORT', default=5432),
+        # Сколько секунд соединение живет между запросами, 0 - закрывать
+        # после каждого запроса (с пулом - возвращать в пул).
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        # Пул соединений воркера для ENGINE api_yamdb.db_pool.
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', default=4)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=5)),
+            'CHECK_INTERVAL': float(
+                os.getenv('DB_POOL_CHECK_INTERVAL', default=1)
+            ),
+        },
+    }
+}
+
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
     }
 }
+
+# Кэш списков категорий и жанров. У LocMemCache свой кэш в каждом
+# воркере, поэтому таймаут ограничивает время жизни устаревших ответов.
+LIST_CACHE_ALIAS = 'default'
+
+LIST_CACHE_TIMEOUT = int(os.getenv('LIST_CACHE_TIMEOUT', default=60))
+
+# Профилирование запросов: заголовок Server-Timing и журнал api.profiling
+# с медленными запросами. Выключенное middleware не подключается.
+PROFILING = {
+    'ENABLED': os.getenv('PROFILING', default='False') == 'True',
+    'SLOW_REQUEST_MS': float(os.getenv('PROFILING_SLOW_MS', default=500)),
+    'SAMPLE_RATE': float(os.getenv('PROFILING_SAMPLE_RATE', default=1.0)),
+    'TOP_QUERIES': 5,
+}
+
+# Метрики Prometheus на /metrics. Каждый воркер gunicorn пишет значения
+# в свои файлы в DIR, эндпоинт суммирует файлы всех воркеров. DIR
+# обязателен при включенных метриках, с TOKEN эндпоинт отдает их только
+# с заголовком Authorization: Bearer <TOKEN>.
+METRICS = {
+    'ENABLED': os.getenv('METRICS', default='False') == 'True',
+    'DIR': os.getenv('METRICS_DIR', default=''),
+    'TOKEN': os.getenv('METRICS_TOKEN', default=''),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.profiling': {'handlers': ['console'], 'level': 'WARNING'},
+    },
+}
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -129,16 +192,42 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 POST_EMAIL = 'from@example.com'
 
+# Фоновая отправка писем (users.mail). ASYNC=False отправляет письмо
+# в запросе, BACKOFF - пауза перед первым повтором, дальше она удваивается.
+MAIL_QUEUE = {
+    'ASYNC': os.getenv('EMAIL_ASYNC', default='True') == 'True',
+    'WORKERS': int(os.getenv('EMAIL_WORKERS', default=2)),
+    'BATCH_SIZE': 50,
+    'MAX_RETRIES': 3,
+    'BACKOFF': 1.0,
+    'FLUSH_TIMEOUT': 10,
+}
+
 SIMPLE_JWT = {
     # Устанавливаем срок жизни токена
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Кэш пользователей для JWT-аутентификации в памяти каждого воркера.
+USER_CACHE = {
+    'MAXSIZE': 10000,
+    'TTL': int(os.getenv('USER_CACHE_TTL', default=60)),
+}
+
+# Роль, username и версия прав пользователя в access-токене: с ними
+# проверка прав не читает таблицу пользователей. Версия прав сверяется
+# через кэш, изменение роли отзывает токены не позже чем через VERSION_TTL.
+JWT_ROLE_CLAIMS = {
+    'ENABLED': os.getenv('JWT_ROLE_CLAIMS', default='False') == 'True',
+    'CACHE_ALIAS': 'default',
+    'VERSION_TTL': int(os.getenv('JWT_VERSION_TTL', default=30)),
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         # Подключаем JWT-токен (необходим python 3.9)
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.export import CHUNK_SIZE, EXPORT_FORMATS, export_catalog
+
+
+class Command(BaseCommand):
+    help = 'exports titles with category, genres and rating as ndjson or csv'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-format', choices=EXPORT_FORMATS, default='ndjson',
+            help='output format'
+        )
+        parser.add_argument(
+            '--reviews', action='store_true',
+            help='include reviews and their comments'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='titles read from the db per query'
+        )
+        parser.add_argument(
+            '--output', type=str, default=None,
+            help='file path, defaults to stdout'
+        )
+
+    def handle(self, *args, **kwargs):
+        lines = export_catalog(
+            kwargs['output_format'], kwargs['reviews'], kwargs['chunk_size']
+        )
+        if kwargs['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        try:
+            with open(kwargs['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                output.writelines(lines)
+        except OSError as e:
+            raise CommandError(f'Error in writing export: {str(e)}')
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.synthetic import SyntheticDataset, parse_scale
+
+from .populate_db import clear_models
+
+
+def positive_int(value):
+    try:
+        return parse_scale(value)
+    except ValueError as e:
+        raise CommandError(str(e))
+
+
+class Command(BaseCommand):
+    help = (
+        'generates users, categories, genres, titles, reviews and comments '
+        'with a Zipf-distributed number of reviews per title and hot authors'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reviews', default='100k',
+            help='number of reviews, e.g. 10k, 100k, 1m'
+        )
+        parser.add_argument(
+            '--titles', help='number of titles (default: reviews / 50)'
+        )
+        parser.add_argument(
+            '--users', help='number of users (default: reviews / 20)'
+        )
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Zipf exponent for reviews per title and authors, '
+                 '0 for uniform data'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='delete all existing data first'
+        )
+
+    def handle(self, *args, **options):
+        if options['skew'] < 0:
+            raise CommandError('Skew must not be negative')
+        if options['batch_size'] <= 0:
+            raise CommandError('Batch size must be positive')
+        dataset = SyntheticDataset(
+            positive_int(options['reviews']),
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            titles=options['titles'] and positive_int(options['titles']),
+            users=options['users'] and positive_int(options['users']),
+            skew=options['skew']
+        )
+        start = time.perf_counter()
+        if options['clear']:
+            try:
+                clear_models()
+            except Exception as e:
+                raise CommandError(f'Cannot clear db. Error: {e}')
+        counts = dataset.generate()
+        elapsed = time.perf_counter() - start
+        for name, count in counts.items():
+            self.stdout.write(f'{name}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{sum(counts.values())} rows generated in {elapsed:.2f}s'
+        ))
@@ -0,0 +1,8 @@
+from .rebuild_title_stats import Command as RebuildTitleStatsCommand
+
+
+class Command(RebuildTitleStatsCommand):
+    help = (
+        'rebuilds ratings of reviews_title table, '
+        'same as rebuild_title_stats'
+    )
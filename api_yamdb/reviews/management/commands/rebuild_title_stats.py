@@ -0,0 +1,102 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Exists, Max, OuterRef, Q, Sum
+from django.utils import timezone
+
+from reviews.models import (SCORES, Comment, Review, Title,
+                            rating_avg_expression, score_field_name)
+
+# Произведений в одном bulk_update.
+BATCH_SIZE = 1000
+STATS_FIELDS = (
+    'rating_sum', 'rating_count', 'comment_count', 'last_review_at',
+    'modified', *(score_field_name(score) for score in SCORES)
+)
+
+
+def get_review_stats():
+    """Счетчики отзывов по произведениям одним GROUP BY, по id."""
+    return Review.objects.order_by('title_id').values('title_id').annotate(
+        rating_sum=Sum('score'),
+        rating_count=Count('id'),
+        last_review_at=Max('pub_date'),
+        **{
+            score_field_name(score): Count('id', filter=Q(score=score))
+            for score in SCORES
+        }
+    ).iterator(chunk_size=BATCH_SIZE)
+
+
+def get_comment_counts():
+    """Количество комментариев по произведениям одним GROUP BY, по id."""
+    return Comment.objects.order_by('review__title_id').values_list(
+        'review__title_id'
+    ).annotate(count=Count('id')).iterator(chunk_size=BATCH_SIZE)
+
+
+def iter_title_stats(now):
+    """Произведения со статистикой: два сгруппированных запроса
+    в порядке id сливаются за один проход. Комментарии бывают только
+    у произведений с отзывами.
+    """
+    comments = get_comment_counts()
+    comment = next(comments, None)
+    for stats in get_review_stats():
+        title_id = stats.pop('title_id')
+        comment_count = 0
+        if comment is not None and comment[0] == title_id:
+            comment_count = comment[1]
+            comment = next(comments, None)
+        yield Title(
+            pk=title_id, comment_count=comment_count, modified=now, **stats
+        )
+
+
+def rebuild_title_stats():
+    """Пересчитывает рейтинг, гистограмму оценок, количество
+    комментариев и дату последнего отзыва всех произведений.
+    Счетчики читаются одним GROUP BY по отзывам и одним по комментариям
+    и записываются пачками bulk_update; произведения без отзывов
+    обнуляются одним UPDATE.
+    """
+    now = timezone.now()
+    count = Title.objects.filter(
+        ~Exists(Review.objects.filter(title=OuterRef('pk')))
+    ).update(
+        modified=now, rating_sum=0, rating_count=0, comment_count=0,
+        last_review_at=None,
+        **{score_field_name(score): 0 for score in SCORES}
+    )
+    batch = []
+    for title in iter_title_stats(now):
+        batch.append(title)
+        if len(batch) >= BATCH_SIZE:
+            Title.objects.bulk_update(batch, STATS_FIELDS)
+            count += len(batch)
+            batch = []
+    if batch:
+        Title.objects.bulk_update(batch, STATS_FIELDS)
+        count += len(batch)
+    return count
+
+
+def refresh_rating_avg():
+    """Обновляет среднюю оценку для сортировки по сумме и количеству."""
+    return Title.objects.update(
+        modified=timezone.now(), rating_avg=rating_avg_expression()
+    )
+
+
+class Command(BaseCommand):
+    help = 'rebuilds ratings, score histograms and comment counts of titles'
+
+    def handle(self, *args, **kwargs):
+        try:
+            with transaction.atomic():
+                count = rebuild_title_stats()
+                refresh_rating_avg()
+        except Exception as e:
+            raise CommandError(f'Error in rebuilding title stats: {str(e)}')
+        self.stdout.write(
+            self.style.SUCCESS(f'{count} title stats rebuilt')
+        )
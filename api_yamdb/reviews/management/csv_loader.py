@@ -0,0 +1,273 @@
+import csv
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DatabaseError, connection, transaction
+
+
+def truncate_models(models):
+    """Очищает таблицы моделей одним TRUNCATE на PostgreSQL.
+    CASCADE очищает и ссылающиеся таблицы, поэтому подходит только
+    для полной очистки, когда очищаются все связанные модели.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('TRUNCATE TABLE {} CASCADE'.format(', '.join(
+            connection.ops.quote_name(model._meta.db_table)
+            for model in models
+        )))
+
+
+class CsvLoadCommand(BaseCommand):
+    """Базовая команда загрузки таблицы из csv-файла.
+    Строки вставляются пачками через bulk_create в одной транзакции,
+    внешние ключи проверяются по заранее загруженным словарям id.
+    С флагом --resume файл читается потоком, каждая пачка фиксируется
+    отдельно, а позиция в файле сохраняется в контрольной точке.
+    """
+    model = None
+    # Поля модели в порядке колонок csv-файла.
+    fields = ()
+    # Поля внешних ключей и модели, на которые они ссылаются.
+    relations = {}
+    batch_size = 1000
+
+    def add_arguments(self, parser):
+        parser.add_argument('filename', type=str, help='filename for csv file')
+        parser.add_argument(
+            '--batch-size', type=int, default=self.batch_size,
+            help='rows per INSERT statement'
+        )
+        parser.add_argument(
+            '--no-clear', action='store_false', dest='clear',
+            help='do not clear the table before loading'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='commit every batch and resume from the last checkpoint'
+        )
+        parser.add_argument(
+            '--checkpoint', type=str, default=None,
+            help='checkpoint file path, defaults to <csv file>.checkpoint'
+        )
+
+    def get_csv_file(self, filename):
+        return os.path.join(settings.BASE_DIR, 'static', 'data', filename)
+
+    def clear_model(self):
+        """Очищает таблицу через ORM: срабатывают on_delete связей
+        и сигналы, обновляющие статистику произведений.
+        """
+        try:
+            self.model.objects.all().delete()
+        except Exception as e:
+            raise CommandError(
+                f'Error in clearing {self.model.__name__}: {str(e)}'
+            )
+
+    def load_relations(self):
+        return {
+            field: {
+                str(pk): pk
+                for pk in model.objects.values_list('pk', flat=True)
+            }
+            for field, model in self.relations.items()
+        }
+
+    def build_object(self, row, relations):
+        data = dict(zip(self.fields, row))
+        for field, ids in relations.items():
+            try:
+                data[field] = ids[data[field]]
+            except KeyError:
+                raise CommandError(
+                    f'Error in inserting {self.model.__name__} '
+                    f'{data.get("id")}: {field}={data[field]} does not exist'
+                )
+        return self.model(**data)
+
+    def read_rows(self, csv_file):
+        csv_reader = csv.reader(csv_file, delimiter=',')
+        next(csv_reader, None)
+        for row in csv_reader:
+            if row:
+                yield row
+
+    def reset_sequences(self):
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [self.model]
+        )
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def after_load(self):
+        """Вызывается в той же транзакции после вставки всех строк."""
+        pass
+
+    def insert_rows(self, rows, batch_size):
+        relations = self.load_relations()
+        batch = []
+        count = 0
+        for row in rows:
+            batch.append(self.build_object(row, relations))
+            if len(batch) >= batch_size:
+                self.model.objects.bulk_create(batch, batch_size=batch_size)
+                count += len(batch)
+                batch = []
+        if batch:
+            self.model.objects.bulk_create(batch, batch_size=batch_size)
+            count += len(batch)
+        return count
+
+    def load(self, file_path, batch_size, clear):
+        with open(file_path, encoding='utf-8') as csv_file, \
+                transaction.atomic():
+            if clear:
+                self.clear_model()
+            count = self.insert_rows(self.read_rows(csv_file), batch_size)
+            self.reset_sequences()
+            self.after_load()
+        return count
+
+    def read_rows_with_offsets(self, csv_file):
+        """Читает строки из бинарного файла с текущей позиции
+        и отдает их вместе со смещением конца строки в байтах.
+        """
+        offset = csv_file.tell()
+        position = [offset]
+
+        def lines():
+            for line in csv_file:
+                position[0] += len(line)
+                yield line.decode('utf-8')
+
+        csv_reader = csv.reader(lines(), delimiter=',')
+        if offset == 0:
+            next(csv_reader, None)
+        for row in csv_reader:
+            if row:
+                yield row, position[0]
+
+    def load_chunk_relations(self, rows):
+        """Загружает только те id внешних ключей, что есть в пачке."""
+        relations = {}
+        for field, model in self.relations.items():
+            column = self.fields.index(field)
+            values = {row[column] for row in rows}
+            relations[field] = {
+                str(pk): pk for pk in model.objects.filter(
+                    pk__in=values
+                ).values_list('pk', flat=True)
+            }
+        return relations
+
+    def insert_chunk(self, rows, batch_size):
+        """Вставляет пачку в своей транзакции, пропуская строки,
+        id которых уже есть в таблице.
+        """
+        with transaction.atomic():
+            existing = {
+                str(pk) for pk in self.model.objects.filter(
+                    pk__in=[row[0] for row in rows]
+                ).values_list('pk', flat=True)
+            }
+            relations = self.load_chunk_relations(rows)
+            objects = [
+                self.build_object(row, relations)
+                for row in rows if row[0] not in existing
+            ]
+            self.model.objects.bulk_create(objects, batch_size=batch_size)
+        return len(objects)
+
+    def read_checkpoint(self, checkpoint_path, file_path):
+        if not os.path.exists(checkpoint_path):
+            return None
+        with open(checkpoint_path, encoding='utf-8') as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        if (checkpoint['file'] != os.path.abspath(file_path)
+                or checkpoint['size'] != os.path.getsize(file_path)):
+            raise CommandError(
+                f'Checkpoint {checkpoint_path} belongs to another file, '
+                f'remove it to start over'
+            )
+        return checkpoint
+
+    def write_checkpoint(self, checkpoint_path, file_path, offset,
+                         last_id, rows):
+        temp_path = f'{checkpoint_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump({
+                'file': os.path.abspath(file_path),
+                'size': os.path.getsize(file_path),
+                'offset': offset,
+                'last_id': last_id,
+                'rows': rows,
+            }, checkpoint_file)
+        os.replace(temp_path, checkpoint_path)
+
+    def load_resumable(self, file_path, batch_size, clear, checkpoint_path):
+        checkpoint_path = checkpoint_path or f'{file_path}.checkpoint'
+        checkpoint = self.read_checkpoint(checkpoint_path, file_path)
+        if checkpoint is None and clear:
+            self.clear_model()
+        offset = checkpoint['offset'] if checkpoint else 0
+        loaded = checkpoint['rows'] if checkpoint else 0
+        count = 0
+        if checkpoint:
+            self.stdout.write(
+                f'resuming after id {checkpoint["last_id"]}, byte {offset}'
+            )
+        with open(file_path, 'rb') as csv_file:
+            csv_file.seek(offset)
+            batch = []
+            for row, offset in self.read_rows_with_offsets(csv_file):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    count += self.insert_chunk(batch, batch_size)
+                    self.write_checkpoint(
+                        checkpoint_path, file_path, offset, batch[-1][0],
+                        loaded + count
+                    )
+                    batch = []
+            if batch:
+                count += self.insert_chunk(batch, batch_size)
+        with transaction.atomic():
+            self.reset_sequences()
+            self.after_load()
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        return count
+
+    def handle(self, *args, **kwargs):
+        filename = kwargs['filename']
+        self.stdout.write(self.style.SUCCESS(f'filename:{filename}'))
+        file_path = self.get_csv_file(filename)
+        start = time.perf_counter()
+        try:
+            if kwargs['resume']:
+                count = self.load_resumable(
+                    file_path, kwargs['batch_size'], kwargs['clear'],
+                    kwargs['checkpoint']
+                )
+            else:
+                count = self.load(
+                    file_path, kwargs['batch_size'], kwargs['clear']
+                )
+        except FileNotFoundError:
+            raise CommandError(f'File {file_path} does not exist')
+        except (DatabaseError, ValidationError, ValueError) as e:
+            raise CommandError(
+                f'Error in inserting {self.model.__name__}: {str(e)}'
+            )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{count} entries added to {self.model.__name__} '
+                f'in {elapsed:.2f}s ({count / (elapsed or 1):.0f} rows/sec)'
+            )
+        )
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-18 16:43
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_ratings(apps, schema_editor):
+    reviews = apps.get_model('reviews', 'Review').objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+
+    def total(function):
+        return Coalesce(
+            Subquery(
+                reviews.annotate(total=function).values('total'),
+                output_field=IntegerField()
+            ),
+            0
+        )
+
+    apps.get_model('reviews', 'Title').objects.update(
+        rating_sum=total(Sum('score')), rating_count=total(Count('pk'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_auto_20220412_1709'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок произведения'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок произведения'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
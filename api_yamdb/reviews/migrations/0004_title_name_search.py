@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+def get_postgresql_indexes():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return [
+        GinIndex(
+            SearchVector('name', config='simple'),
+            name='title_name_search_idx'
+        ),
+        GinIndex(
+            fields=['name'],
+            opclasses=['gin_trgm_ops'],
+            name='title_name_trgm_idx'
+        ),
+    ]
+
+
+def add_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    title = apps.get_model('reviews', 'Title')
+    for index in get_postgresql_indexes():
+        schema_editor.add_index(title, index)
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    title = apps.get_model('reviews', 'Title')
+    for index in get_postgresql_indexes():
+        schema_editor.remove_index(title, index)
+    schema_editor.execute('DROP EXTENSION IF EXISTS pg_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_rating'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_indexes, remove_search_indexes),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 3.2.25 on 2026-10-18 16:59
+
+from django.db import migrations, models
+from django.db.models import (Count, IntegerField, Max, OuterRef, Subquery,
+                              Sum)
+from django.db.models.functions import Coalesce
+
+
+def fill_title_stats(apps, schema_editor):
+    reviews = apps.get_model('reviews', 'Review').objects.filter(
+        title=OuterRef('pk')
+    )
+    comments = apps.get_model('reviews', 'Comment').objects.filter(
+        review__title=OuterRef('pk')
+    )
+
+    def aggregate(queryset, group_by, function):
+        return Subquery(
+            queryset.order_by().values(group_by).annotate(
+                total=function
+            ).values('total')
+        )
+
+    def count(queryset, group_by='title', function=Count('pk')):
+        return Coalesce(
+            aggregate(queryset, group_by, function), 0,
+            output_field=IntegerField()
+        )
+
+    apps.get_model('reviews', 'Title').objects.update(
+        rating_sum=count(reviews, function=Sum('score')),
+        rating_count=count(reviews),
+        comment_count=count(comments, group_by='review__title'),
+        last_review_at=aggregate(reviews, 'title', Max('pub_date')),
+        **{
+            f'score_{score}': count(reviews.filter(score=score))
+            for score in range(1, 11)
+        }
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев к отзывам'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='last_review_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Дата последнего отзыва'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_1',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 1'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_10',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 10'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_2',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 2'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_3',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 3'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_4',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 4'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_5',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 5'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_6',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 6'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_7',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 7'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_8',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 8'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_9',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 9'),
+        ),
+        migrations.RunPython(fill_title_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:02
+
+from django.db import migrations, models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+def fill_rating_avg(apps, schema_editor):
+    apps.get_model('reviews', 'Title').objects.update(rating_avg=Coalesce(
+        Cast(F('rating_sum'), FloatField()) / NullIf(F('rating_count'), 0),
+        0.0
+    ))
+
+
+def get_postgresql_ordering_indexes():
+    return [
+        models.Index(
+            F('last_review_at').desc(nulls_last=True), F('id').desc(),
+            name='title_last_review_desc_idx'
+        ),
+    ]
+
+
+def add_ordering_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    title = apps.get_model('reviews', 'Title')
+    for index in get_postgresql_ordering_indexes():
+        schema_editor.add_index(title, index)
+
+
+def remove_ordering_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    title = apps.get_model('reviews', 'Title')
+    for index in get_postgresql_ordering_indexes():
+        schema_editor.remove_index(title, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating_avg',
+            field=models.FloatField(default=0, editable=False, verbose_name='Средняя оценка произведения для сортировки'),
+        ),
+        migrations.RunPython(fill_rating_avg, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating_avg', 'id'], name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'id'], name='title_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating_count', 'id'], name='title_review_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['last_review_at', 'id'], name='title_last_review_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'rating_avg', 'id'], name='title_category_rating_idx'),
+        ),
+        migrations.RunPython(add_ordering_indexes, remove_ordering_indexes),
+    ]
@@ -1,8 +1,37 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
 
 from users.models import User
 
+# Возможные оценки отзыва, для каждой у произведения хранится счетчик.
+SCORES = range(1, 11)
+
+
+def score_field_name(score):
+    return f'score_{score}'
+
+
+def rating_avg_expression(sum_delta=0, count_delta=0):
+    """Средняя оценка по сумме и количеству оценок с учетом изменений,
+    0 у произведения без оценок.
+    """
+    return Coalesce(
+        Cast(F('rating_sum') + sum_delta, FloatField())
+        / NullIf(F('rating_count') + count_delta, 0),
+        0.0
+    )
+
+
+def score_count_field(score):
+    return models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=f'Количество оценок {score}'
+    )
+
 
 class Genre(models.Model):
     name = models.CharField(max_length=256, verbose_name='Название жанра')
@@ -61,14 +90,90 @@ class Title(models.Model):
         related_name='categories',
         verbose_name='Категория произведения'
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок произведения'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество оценок произведения'
+    )
+    rating_avg = models.FloatField(
+        default=0,
+        editable=False,
+        verbose_name='Средняя оценка произведения для сортировки'
+    )
+    score_1 = score_count_field(1)
+    score_2 = score_count_field(2)
+    score_3 = score_count_field(3)
+    score_4 = score_count_field(4)
+    score_5 = score_count_field(5)
+    score_6 = score_count_field(6)
+    score_7 = score_count_field(7)
+    score_8 = score_count_field(8)
+    score_9 = score_count_field(9)
+    score_10 = score_count_field(10)
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев к отзывам'
+    )
+    last_review_at = models.DateTimeField(
+        null=True,
+        editable=False,
+        verbose_name='Дата последнего отзыва'
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения произведения или его отзывов'
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        # Индексы под сортировки списка и лидерборд /titles/top/,
+        # индекс по убыванию даты отзыва для PostgreSQL в миграции 0007.
+        indexes = [
+            models.Index(fields=['rating_avg', 'id'], name='title_rating_idx'),
+            models.Index(fields=['year', 'id'], name='title_year_idx'),
+            models.Index(
+                fields=['rating_count', 'id'], name='title_review_count_idx'
+            ),
+            models.Index(
+                fields=['last_review_at', 'id'], name='title_last_review_idx'
+            ),
+            models.Index(
+                fields=['category', 'rating_avg', 'id'],
+                name='title_category_rating_idx'
+            ),
+            models.Index(
+                fields=['category', 'year'], name='title_category_year_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка произведения по накопленным сумме и количеству."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+    @property
+    def review_count(self):
+        return self.rating_count
+
+    @property
+    def score_histogram(self):
+        """Количество отзывов с каждой оценкой от 1 до 10."""
+        return {
+            score: getattr(self, score_field_name(score)) for score in SCORES
+        }
+
 
 class Review(models.Model):
     title = models.ForeignKey(
@@ -91,15 +196,28 @@ class Review(models.Model):
         validators=[MinValueValidator(1), MaxValueValidator(10)],
         verbose_name='Оценка произведения'
     )
+    # Не auto_now_add: bulk_create загрузчиков сохраняет даты из файла.
     pub_date = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         db_index=True,
         verbose_name='Дата публикации отзыва'
     )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения отзыва или его комментариев'
+    )
 
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
+        # Список отзывов произведения по (pub_date, id).
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
@@ -125,7 +243,8 @@ class Comment(models.Model):
         verbose_name='Автор комментария'
     )
     pub_date = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         db_index=True,
         verbose_name='Дата публикации комментария'
     )
@@ -133,6 +252,13 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        # Список комментариев отзыва по (pub_date, id).
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
 
 class TitleGenre(models.Model):
@@ -154,6 +280,12 @@ class TitleGenre(models.Model):
     class Meta:
         verbose_name = 'Жанр произведения'
         verbose_name_plural = 'Жанры произведений'
+        # Для EXISTS-подзапросов фильтра произведений по жанрам.
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'], name='titlegenre_genre_title_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.title} {self.genre}'
@@ -0,0 +1,119 @@
+"""Индексируемый поиск произведений по названию.
+
+На PostgreSQL поиск идет по tsvector и триграммам, оба покрыты
+GIN-индексами, которые вместе с расширением pg_trgm создает
+миграция 0004. На SQLite используется виртуальная
+таблица FTS5, которую поддерживают в актуальном состоянии триггеры.
+На остальных бэкендах остается поиск через icontains.
+"""
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'simple'
+SQLITE_FTS_TABLE = 'reviews_title_fts'
+
+
+def search_titles(queryset, query):
+    """Фильтрует произведения по названию и сортирует по релевантности.
+    Каждой записи добавляется аннотация search_rank.
+    """
+    query = query.strip()
+    if not query:
+        return queryset
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        return _search_postgresql(queryset, query)
+    if vendor == 'sqlite':
+        return _search_sqlite(queryset, query)
+    return queryset.filter(name__icontains=query)
+
+
+def _search_postgresql(queryset, query):
+    from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                                SearchVector,
+                                                TrigramSimilarity)
+
+    vector = SearchVector('name', config=SEARCH_CONFIG)
+    search_query = SearchQuery(query, config=SEARCH_CONFIG)
+    return queryset.annotate(
+        name_vector=vector,
+        search_rank=(
+            SearchRank(vector, search_query)
+            + TrigramSimilarity('name', query)
+        )
+    ).filter(
+        Q(name_vector=search_query) | Q(name__trigram_similar=query)
+    ).order_by('-search_rank', 'id')
+
+
+def _sqlite_match(query):
+    """Превращает ввод пользователя в безопасный префиксный запрос FTS5."""
+    return ' '.join(
+        '"{}"*'.format(term.replace('"', '""')) for term in query.split()
+    )
+
+
+def _search_sqlite(queryset, query):
+    match = _sqlite_match(query)
+    title_table = queryset.model._meta.db_table
+    return queryset.filter(
+        pk__in=RawSQL(
+            f'SELECT rowid FROM {SQLITE_FTS_TABLE} '
+            f'WHERE {SQLITE_FTS_TABLE} MATCH %s',
+            (match,)
+        )
+    ).annotate(
+        search_rank=RawSQL(
+            f'SELECT -rank FROM {SQLITE_FTS_TABLE} '
+            f'WHERE {SQLITE_FTS_TABLE} MATCH %s '
+            f'AND rowid = "{title_table}"."id"',
+            (match,)
+        )
+    ).order_by('-search_rank', 'id')
+
+
+def install_sqlite_search(sender, using, **kwargs):
+    """Создает таблицу FTS5 и триггеры для SQLite после миграций.
+    SQLite пересоздает таблицу произведений при изменении схемы и теряет
+    триггеры, поэтому они проверяются после каждого migrate, а индекс
+    перестраивается при их восстановлении.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    table = SQLITE_FTS_TABLE
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' "
+            "AND name = %s",
+            [f'{table}_ai']
+        )
+        if cursor.fetchone():
+            return
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5('
+            f"name, content='reviews_title', content_rowid='id')"
+        )
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {table}_ai '
+            f'AFTER INSERT ON reviews_title BEGIN '
+            f'INSERT INTO {table}(rowid, name) VALUES (new.id, new.name); '
+            f'END'
+        )
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {table}_ad '
+            f'AFTER DELETE ON reviews_title BEGIN '
+            f"INSERT INTO {table}({table}, rowid, name) "
+            f"VALUES ('delete', old.id, old.name); "
+            f'END'
+        )
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {table}_au '
+            f'AFTER UPDATE OF name ON reviews_title BEGIN '
+            f"INSERT INTO {table}({table}, rowid, name) "
+            f"VALUES ('delete', old.id, old.name); "
+            f'INSERT INTO {table}(rowid, name) VALUES (new.id, new.name); '
+            f'END'
+        )
+        cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
@@ -0,0 +1,189 @@
+from collections import Counter
+
+from django.db.models import F, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save, pre_delete)
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .models import (Category, Comment, Genre, Review, Title,
+                     rating_avg_expression, score_field_name)
+
+# Отправляется после bulk_create, который не вызывает post_save.
+post_bulk_create = Signal()
+
+
+def change_title_stats(title_id, counters, last_review_at=None):
+    """Атомарно прибавляет к счетчикам произведения значения counters
+    и отмечает время изменения его отзывов.
+    """
+    values = {
+        field: F(field) + delta for field, delta in counters.items() if delta
+    }
+    if 'rating_sum' in values or 'rating_count' in values:
+        values['rating_avg'] = rating_avg_expression(
+            counters.get('rating_sum', 0), counters.get('rating_count', 0)
+        )
+    if last_review_at is not None:
+        values['last_review_at'] = last_review_at
+    Title.objects.filter(pk=title_id).update(
+        modified=timezone.now(), **values
+    )
+
+
+def count_reviews(counters, score, count):
+    """Добавляет в counters изменения от count отзывов с оценкой score."""
+    counters.update({
+        'rating_sum': score * count,
+        'rating_count': count,
+        score_field_name(score): count,
+    })
+    return counters
+
+
+def later_review(pub_date):
+    """Дата последнего отзыва с учетом нового отзыва от pub_date."""
+    pub_date = Value(pub_date)
+    return Coalesce(Greatest('last_review_at', pub_date), pub_date)
+
+
+def latest_review(title_id):
+    """Дата последнего из оставшихся отзывов произведения."""
+    return Subquery(
+        Review.objects.filter(title=title_id).order_by(
+            '-pub_date'
+        ).values('pub_date')[:1]
+    )
+
+
+def review_title(review_id):
+    """Произведение отзыва подзапросом, без отдельного запроса."""
+    return Subquery(Review.objects.filter(pk=review_id).values('title'))
+
+
+@receiver(post_init, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    """Запоминает оценку и произведение, с которыми отзыв был загружен."""
+    instance._rated_title_id = instance.title_id
+    instance._rated_score = instance.score
+
+
+@receiver(post_save, sender=Review)
+def update_stats_on_save(sender, instance, created, **kwargs):
+    """Обновляет рейтинг и гистограмму при создании или изменении отзыва."""
+    old_title_id = None if created else instance._rated_title_id
+    old_score = instance._rated_score
+    if old_title_id == instance.title_id:
+        counters = count_reviews(Counter(), old_score, -1)
+        change_title_stats(
+            instance.title_id, count_reviews(counters, instance.score, 1)
+        )
+    else:
+        if old_title_id is not None:
+            change_title_stats(
+                old_title_id, count_reviews(Counter(), old_score, -1),
+                latest_review(old_title_id)
+            )
+        change_title_stats(
+            instance.title_id, count_reviews(Counter(), instance.score, 1),
+            later_review(instance.pub_date)
+        )
+    remember_review_score(sender, instance)
+
+
+@receiver(post_bulk_create, sender=Review)
+def update_stats_on_bulk_create(sender, instances, **kwargs):
+    """Добавляет оценки пачки отзывов одним запросом на произведение."""
+    counters, pub_dates = {}, {}
+    for review in instances:
+        count_reviews(
+            counters.setdefault(review.title_id, Counter()), review.score, 1
+        )
+        pub_dates[review.title_id] = max(
+            pub_dates.get(review.title_id, review.pub_date), review.pub_date
+        )
+    for title_id, title_counters in counters.items():
+        change_title_stats(
+            title_id, title_counters, later_review(pub_dates[title_id])
+        )
+
+
+@receiver(post_delete, sender=Review)
+def update_stats_on_delete(sender, instance, **kwargs):
+    """Убирает оценку удаленного отзыва из статистики произведения."""
+    change_title_stats(
+        instance._rated_title_id,
+        count_reviews(Counter(), instance._rated_score, -1),
+        latest_review(instance._rated_title_id)
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_review(sender, instance, **kwargs):
+    """Отмечает время изменения комментариев отзыва."""
+    Review.objects.filter(pk=instance.review_id).update(
+        modified=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_on_save(sender, instance, created, **kwargs):
+    if created:
+        change_title_stats(
+            review_title(instance.review_id), {'comment_count': 1}
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def count_comment_on_delete(sender, instance, **kwargs):
+    change_title_stats(
+        review_title(instance.review_id), {'comment_count': -1}
+    )
+
+
+@receiver(post_bulk_create, sender=Comment)
+def touch_reviews_on_bulk_create(sender, instances, **kwargs):
+    """Отмечает время изменения отзывов пачки комментариев
+    и добавляет комментарии к статистике их произведений.
+    """
+    counts = Counter(comment.review_id for comment in instances)
+    Review.objects.filter(pk__in=counts).update(modified=timezone.now())
+    for review_id, count in counts.items():
+        change_title_stats(review_title(review_id), {'comment_count': count})
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_titles_on_genre_change(sender, instance, action, reverse,
+                                 pk_set, **kwargs):
+    """Отмечает изменение произведений, у которых поменялись жанры."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        titles = Title.objects.filter(pk=instance.pk)
+    elif pk_set is None:
+        titles = Title.objects.filter(genres__genre=instance)
+    else:
+        titles = Title.objects.filter(pk__in=pk_set)
+    titles.update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_titles(sender, instance, **kwargs):
+    """Отмечает изменение произведений, у которых переименована
+    или удаляется категория.
+    """
+    Title.objects.filter(category=instance).update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_genre_titles(sender, instance, **kwargs):
+    """Отмечает изменение произведений, у которых переименован
+    или удаляется жанр.
+    """
+    Title.objects.filter(genres__genre=instance).update(
+        modified=timezone.now()
+    )
@@ -0,0 +1,273 @@
+import heapq
+import random
+import uuid
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from users.models import User
+
+from .management.commands.rebuild_title_stats import (
+    rebuild_title_stats, refresh_rating_avg)
+from .models import Category, Comment, Genre, Review, Title, TitleGenre
+
+# Пропорции набора относительно количества отзывов.
+REVIEWS_PER_TITLE = 50
+REVIEWS_PER_USER = 20
+CATEGORY_COUNT = 10
+GENRE_COUNT = 30
+MAX_GENRES_PER_TITLE = 3
+# Количество комментариев к отзыву выбирается от 0 до этого значения.
+MAX_COMMENTS_PER_REVIEW = 2
+START_DATE = datetime(2015, 1, 1, tzinfo=timezone.utc)
+DATE_SPAN = int(timedelta(days=3650).total_seconds())
+WORDS = (
+    'время', 'город', 'дорога', 'друг', 'жизнь', 'звезда', 'земля',
+    'история', 'лето', 'любовь', 'мир', 'море', 'небо', 'ночь', 'огонь',
+    'песня', 'путь', 'река', 'свет', 'сердце', 'сила', 'сон', 'тень',
+    'утро', 'ветер', 'война', 'голос', 'дом', 'игра', 'память',
+)
+SCALE_SUFFIXES = {'k': 1000, 'm': 1000000}
+
+
+def parse_scale(value):
+    """Количество строк: число или число с суффиксом k/m (10k, 1m)."""
+    value = value.strip().lower()
+    multiplier = SCALE_SUFFIXES.get(value[-1:], 1)
+    if multiplier > 1:
+        value = value[:-1]
+    try:
+        scale = int(value) * multiplier
+    except ValueError:
+        raise ValueError(f'Invalid scale: {value}')
+    if scale <= 0:
+        raise ValueError('Scale must be positive')
+    return scale
+
+
+class SyntheticDataset:
+    """Детерминированный набор данных заданного размера.
+    Размер задается количеством отзывов, остальные таблицы
+    масштабируются от него. Одинаковые reviews и seed дают
+    одинаковые строки. Строки вставляются пачками через bulk_create
+    с явными id после уже существующих, статистика произведений
+    пересчитывается в конце.
+    При skew > 0 отзывы по произведениям и активность авторов
+    распределены по закону Ципфа с этим показателем: немногие
+    популярные произведения и авторы дают большую часть отзывов.
+    """
+
+    def __init__(self, reviews, seed=0, batch_size=5000, titles=None,
+                 users=None, skew=0):
+        self.rng = random.Random(seed)
+        self.review_count = reviews
+        self.title_count = titles or max(1, reviews // REVIEWS_PER_TITLE)
+        self.user_count = users or reviews // REVIEWS_PER_USER
+        self.skew = skew
+        self.batch_size = batch_size
+        self.counts = Counter()
+        self.author_weights = self.author_cum_weights = None
+
+    def get_zipf_weights(self, count):
+        """Веса Ципфа для count объектов, ранги перемешаны, чтобы
+        популярными были не первые id. None без перекоса.
+        """
+        if not self.skew:
+            return None
+        ranks = list(range(1, count + 1))
+        self.rng.shuffle(ranks)
+        return [rank ** -self.skew for rank in ranks]
+
+    def set_author_weights(self, users):
+        self.author_weights = self.get_zipf_weights(len(users))
+        if self.author_weights:
+            self.author_cum_weights = list(accumulate(self.author_weights))
+
+    def pick_author(self, users):
+        if not self.author_weights:
+            return self.rng.choice(users)
+        return self.rng.choices(users, cum_weights=self.author_cum_weights)[0]
+
+    def pick_authors(self, users, count):
+        """count разных авторов с учетом их активности."""
+        if not self.author_weights:
+            return self.rng.sample(users, count)
+        if count * 10 > len(users):
+            # Много авторов сразу: взвешенная выборка без повторов
+            # по ключам random ** (1 / вес) за один проход.
+            return heapq.nlargest(count, users, key=lambda user: (
+                self.rng.random() ** (
+                    1 / self.author_weights[user - users.start]
+                )
+            ))
+        authors, picked = [], set()
+        while len(authors) < count:
+            for user in self.rng.choices(
+                users, cum_weights=self.author_cum_weights,
+                k=count - len(authors)
+            ):
+                if user not in picked:
+                    picked.add(user)
+                    authors.append(user)
+        return authors
+
+    def words(self, count):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(count))
+
+    def random_date(self):
+        return self.rng.randrange(DATE_SPAN)
+
+    def next_id(self, model):
+        return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def insert(self, model, objects):
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                model.objects.bulk_create(batch)
+                self.counts[model.__name__] += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch)
+            self.counts[model.__name__] += len(batch)
+
+    def create_users(self, count):
+        first_id = self.next_id(User)
+        self.insert(User, (
+            User(
+                pk=pk,
+                username=f'synthetic{pk}',
+                email=f'synthetic{pk}@yamdb.fake',
+                bio=self.words(5),
+                confirmation_code=uuid.UUID(int=self.rng.getrandbits(128)),
+            )
+            for pk in range(first_id, first_id + count)
+        ))
+        return range(first_id, first_id + count)
+
+    def create_named(self, model, prefix, count):
+        first_id = self.next_id(model)
+        self.insert(model, (
+            model(
+                pk=pk,
+                name=f'{self.words(2).capitalize()} {pk}',
+                slug=f'{prefix}-{pk}',
+            )
+            for pk in range(first_id, first_id + count)
+        ))
+        return range(first_id, first_id + count)
+
+    def create_titles(self, categories, genres):
+        first_id = self.next_id(Title)
+        title_ids = range(first_id, first_id + self.title_count)
+        self.insert(Title, (
+            Title(
+                pk=pk,
+                name=f'{self.words(3).capitalize()} {pk}',
+                year=self.rng.randint(1900, 2022),
+                description=self.words(20),
+                category_id=self.rng.choice(categories),
+            )
+            for pk in title_ids
+        ))
+        self.insert(TitleGenre, (
+            TitleGenre(title_id=pk, genre_id=genre)
+            for pk in title_ids
+            for genre in self.rng.sample(
+                genres, self.rng.randint(1, MAX_GENRES_PER_TITLE)
+            )
+        ))
+        return title_ids
+
+    def get_reviews_per_title(self, title_ids):
+        return Counter(self.rng.choices(
+            title_ids, weights=self.get_zipf_weights(len(title_ids)),
+            k=self.review_count
+        ))
+
+    def create_reviews(self, reviews_per_title, users):
+        """Вставляет отзывы, у каждого произведения авторы разные.
+        Возвращает id первого отзыва и сдвиги дат всех отзывов.
+        """
+        first_id = self.next_id(Review)
+        dates = array('l')
+
+        def reviews():
+            pk = first_id
+            for title_id, count in sorted(reviews_per_title.items()):
+                for author_id in self.pick_authors(users, count):
+                    dates.append(self.random_date())
+                    yield Review(
+                        pk=pk,
+                        title_id=title_id,
+                        author_id=author_id,
+                        text=self.words(30),
+                        score=self.rng.randint(1, 10),
+                        pub_date=START_DATE + timedelta(seconds=dates[-1]),
+                    )
+                    pk += 1
+
+        self.insert(Review, reviews())
+        return first_id, dates
+
+    def create_comments(self, first_review_id, review_dates, users):
+        first_id = self.next_id(Comment)
+
+        def comments():
+            pk = first_id
+            for offset, date in enumerate(review_dates):
+                count = self.rng.randint(0, MAX_COMMENTS_PER_REVIEW)
+                for _ in range(count):
+                    date += self.rng.randrange(86400)
+                    yield Comment(
+                        pk=pk,
+                        review_id=first_review_id + offset,
+                        author_id=self.pick_author(users),
+                        text=self.words(10),
+                        pub_date=START_DATE + timedelta(seconds=date),
+                    )
+                    pk += 1
+
+        self.insert(Comment, comments())
+
+    def reset_sequences(self):
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [User, Category, Genre, Title, TitleGenre,
+                         Review, Comment]
+        )
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def generate(self):
+        """Создает набор одной транзакцией и возвращает количество
+        вставленных строк по моделям.
+        """
+        with transaction.atomic():
+            categories = self.create_named(Category, 'category',
+                                           CATEGORY_COUNT)
+            genres = self.create_named(Genre, 'genre', GENRE_COUNT)
+            title_ids = self.create_titles(categories, genres)
+            reviews_per_title = self.get_reviews_per_title(title_ids)
+            # Авторов не меньше, чем отзывов у самого популярного
+            # произведения: у него все отзывы от разных пользователей.
+            users = self.create_users(max(
+                self.user_count,
+                max(reviews_per_title.values(), default=0),
+                1
+            ))
+            self.set_author_weights(users)
+            first_review_id, review_dates = self.create_reviews(
+                reviews_per_title, users
+            )
+            self.create_comments(first_review_id, review_dates, users)
+            self.reset_sequences()
+            rebuild_title_stats()
+            refresh_rating_avg()
+        return dict(self.counts)
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+# Поля пользователя, которых хватает для проверки прав.
+CACHED_USER_FIELDS = ('id', 'username', 'role', 'is_superuser', 'is_active')
+# Поля пользователя, которые в режиме JWT_ROLE_CLAIMS пишутся в токен.
+ROLE_CLAIMS = ('username', 'role', 'is_superuser')
+VERSION_CLAIM = 'user_version'
+
+
+class TTLCache:
+    """Потокобезопасный LRU-кэш с временем жизни записей."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self.data[key]
+                return None
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = (time.monotonic() + self.ttl, value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+user_cache = TTLCache(
+    settings.USER_CACHE['MAXSIZE'], settings.USER_CACHE['TTL']
+)
+
+
+def build_user(values):
+    """Собирает пользователя из известных полей, остальные поля отложены
+    и загрузятся из базы при обращении к ним.
+    """
+    # from_db ждет значения в порядке полей модели.
+    fields = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in values
+    ]
+    return User.from_db(
+        DEFAULT_DB_ALIAS, fields, [values[field] for field in fields]
+    )
+
+
+def get_version_cache():
+    return caches[settings.JWT_ROLE_CLAIMS['CACHE_ALIAS']]
+
+
+def get_user_version(user_id):
+    """Текущая версия прав пользователя: из кэша или одним запросом."""
+    cache = get_version_cache()
+    key = f'user-version:{user_id}'
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list(
+            'token_version', flat=True
+        ).first()
+        cache.set(key, version, settings.JWT_ROLE_CLAIMS['VERSION_TTL'])
+    return version
+
+
+def set_user_version(user_id, version):
+    get_version_cache().set(
+        f'user-version:{user_id}', version,
+        settings.JWT_ROLE_CLAIMS['VERSION_TTL']
+    )
+
+
+def add_role_claims(token, user):
+    """Добавляет в токен роль пользователя и версию его прав."""
+    for claim in ROLE_CLAIMS:
+        token[claim] = getattr(user, claim)
+    token[VERSION_CLAIM] = user.token_version
+    return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса пользователя на каждый запрос.
+    Если включен JWT_ROLE_CLAIMS и токен содержит роль, пользователь
+    собирается из токена, а токен с устаревшей версией прав отклоняется.
+    Иначе поля CACHED_USER_FIELDS берутся из кэша воркера: запись
+    удаляется при сохранении пользователя, в других воркерах она живет
+    не дольше USER_CACHE['TTL'] секунд.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if (settings.JWT_ROLE_CLAIMS['ENABLED'] and user_id is not None
+                and VERSION_CLAIM in validated_token):
+            return self.get_token_user(user_id, validated_token)
+        values = user_cache.get(user_id) if user_id is not None else None
+        if values is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, {
+                field: getattr(user, field) for field in CACHED_USER_FIELDS
+            })
+            return user
+        return build_user(values)
+
+    def get_token_user(self, user_id, validated_token):
+        version = get_user_version(user_id)
+        if version is None:
+            raise AuthenticationFailed(
+                'User not found', code='user_not_found'
+            )
+        if version != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                'Права пользователя изменились, получите новый токен',
+                code='user_version_outdated'
+            )
+        values = {claim: validated_token[claim] for claim in ROLE_CLAIMS}
+        return build_user({**values, 'id': user_id, 'is_active': True})
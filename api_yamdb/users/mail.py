@@ -0,0 +1,134 @@
+"""Фоновая отправка писем.
+
+Письма складываются в очередь и отправляются пулом фоновых потоков:
+каждый поток забирает пачку писем и отправляет их по одному через одно
+подключение к почтовому бэкенду, при ошибке повторяя с нарастающей
+паузой только неотправленные. Письмо с отклоненными или неверными
+адресами не повторяется. Так запрос не ждет SMTP-сервер.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from smtplib import SMTPRecipientsRefused
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+logger = logging.getLogger(__name__)
+
+
+class MailQueue:
+    """Очередь писем с пулом потоков-отправителей."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.workers = []
+        self.lock = threading.Lock()
+
+    @property
+    def options(self):
+        return settings.MAIL_QUEUE
+
+    def start(self):
+        with self.lock:
+            if self.workers:
+                return
+            for number in range(self.options['WORKERS']):
+                worker = threading.Thread(
+                    target=self.run, name=f'mail-queue-{number}', daemon=True
+                )
+                worker.start()
+                self.workers.append(worker)
+            atexit.register(self.flush, self.options['FLUSH_TIMEOUT'])
+
+    def send(self, message):
+        """Ставит письмо в очередь, при ASYNC=False отправляет сразу."""
+        if not self.options['ASYNC']:
+            self.deliver([message])
+            return
+        self.start()
+        self.queue.put(message)
+
+    def next_batch(self):
+        batch = [self.queue.get()]
+        while len(batch) < self.options['BATCH_SIZE']:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            try:
+                self.deliver(batch)
+            except Exception:
+                logger.exception('Cannot send %d emails', len(batch))
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def send_pending(self, pending):
+        """Отправляет письма по одному через одно подключение и убирает
+        отправленные из pending. Отказ в адресах получателей — ошибка
+        только этого письма, оно не повторяется.
+        """
+        with get_connection() as connection:
+            while pending:
+                try:
+                    connection.send_messages([pending[0]])
+                except (SMTPRecipientsRefused, ValueError):
+                    logger.exception(
+                        'Email to %s rejected',
+                        ', '.join(pending[0].recipients())
+                    )
+                pending.popleft()
+
+    def deliver(self, batch):
+        """Отправляет пачку, при ошибке повторяет неотправленные."""
+        retries = self.options['MAX_RETRIES']
+        pending = deque(batch)
+        for attempt in range(retries + 1):
+            try:
+                self.send_pending(pending)
+                return
+            except Exception:
+                if attempt == retries:
+                    raise
+                delay = self.options['BACKOFF'] * 2 ** attempt
+                logger.warning(
+                    'Email delivery failed, retry in %.1fs', delay
+                )
+                time.sleep(delay)
+
+    def flush(self, timeout=None):
+        """Ждет отправки всех писем из очереди не дольше timeout секунд."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = (
+                    None if deadline is None
+                    else deadline - time.monotonic()
+                )
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+
+mail_queue = MailQueue()
+
+
+def send_confirmation_code(user):
+    """Ставит в очередь письмо с кодом подтверждения."""
+    mail_queue.send(EmailMessage(
+        'Добро пожаловать на YaMDB',
+        f'Дорогой {user.username},\n'
+        f'Ваш confirmation_code: {user.confirmation_code}',
+        settings.POST_EMAIL,
+        [f'{user.email}'],
+    ))
@@ -26,6 +26,11 @@ class User(AbstractUser):
         max_length=36,
         auto_created=True
     )
+    token_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия прав пользователя'
+    )
 
     REQUIRED_FIELDS = ['email', ]
 
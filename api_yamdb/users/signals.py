@@ -0,0 +1,44 @@
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from .authentication import set_user_version, user_cache
+from .models import User
+
+# Поля, изменение которых делает недействительными роли в токенах.
+RIGHTS_FIELDS = ('role', 'is_superuser', 'is_active')
+
+
+def get_rights(instance):
+    # Отложенные поля не читаются, чтобы не загружать их из базы.
+    return tuple(instance.__dict__.get(field) for field in RIGHTS_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_rights(sender, instance, **kwargs):
+    instance._saved_rights = get_rights(instance)
+
+
+@receiver(pre_save, sender=User)
+def bump_token_version(sender, instance, **kwargs):
+    """Увеличивает версию прав при смене роли или активности."""
+    instance._rights_changed = (
+        not instance._state.adding
+        and get_rights(instance) != instance._saved_rights
+    )
+    if instance._rights_changed:
+        instance.token_version += 1
+
+
+@receiver(post_save, sender=User)
+def publish_token_version(sender, instance, **kwargs):
+    if instance._rights_changed:
+        set_user_version(instance.pk, instance.token_version)
+    remember_rights(sender, instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Убирает пользователя из кэша аутентификации при изменении."""
+    user_cache.delete(instance.pk)
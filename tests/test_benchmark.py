@@ -0,0 +1,110 @@
+import pytest
+
+SCALE = 300
+
+
+def snapshot():
+    from reviews.models import Comment, Review, Title
+
+    return (
+        list(Title.objects.order_by('pk').values_list(
+            'pk', 'name', 'year', 'category_id'
+        )),
+        list(Review.objects.order_by('pk').values_list(
+            'pk', 'title_id', 'author_id', 'score', 'pub_date'
+        )),
+        Comment.objects.count(),
+    )
+
+
+def clear_dataset():
+    from reviews.models import Category, Genre, Title
+    from users.models import User
+
+    Title.objects.all().delete()
+    for model in (Category, Genre, User):
+        model.objects.all().delete()
+
+
+@pytest.mark.django_db
+class TestSyntheticDataset:
+
+    def test_same_seed_same_rows(self):
+        from reviews.synthetic import SyntheticDataset
+
+        counts = SyntheticDataset(SCALE, seed=7).generate()
+        assert counts['Review'] == SCALE
+        first = snapshot()
+        clear_dataset()
+        SyntheticDataset(SCALE, seed=7).generate()
+        assert snapshot() == first, (
+            'Проверьте, что набор данных детерминирован по seed'
+        )
+
+    def test_title_stats_rebuilt(self):
+        from django.db.models import Sum
+
+        from reviews.models import Comment, Title
+        from reviews.synthetic import SyntheticDataset
+
+        SyntheticDataset(SCALE).generate()
+        totals = Title.objects.aggregate(
+            reviews=Sum('rating_count'), comments=Sum('comment_count')
+        )
+        assert totals == {
+            'reviews': SCALE, 'comments': Comment.objects.count()
+        }
+
+
+@pytest.mark.django_db
+class TestBenchmark:
+
+    def test_all_endpoints_measured(self):
+        from api.benchmark import ENDPOINTS, run_benchmark
+        from reviews.synthetic import SyntheticDataset
+
+        SyntheticDataset(SCALE).generate()
+        results = run_benchmark(iterations=3, warmup=0)
+        assert list(results) == [name for name, path, params in ENDPOINTS]
+        for name, result in results.items():
+            assert result['status'] == 200, (
+                f'Проверьте, что эндпоинт `{name}` отвечает 200'
+            )
+            assert result['p50'] <= result['p95'] <= result['p99']
+            assert result['bytes'] > 0
+        assert results['titles']['queries'] > 0
+
+    def test_compare(self):
+        from api.benchmark import compare
+
+        baseline = {'titles': {'p95': 10, 'queries': 4, 'bytes': 1000}}
+        assert compare(
+            {'titles': {'p95': 11, 'queries': 4, 'bytes': 1000}}, baseline
+        ) == []
+        regressions = compare(
+            {'titles': {'p95': 13, 'queries': 5, 'bytes': 1000}}, baseline
+        )
+        assert regressions == [
+            'titles: queries 4 -> 5', 'titles: p95 10 -> 13'
+        ]
+
+    def test_percentile(self):
+        import statistics
+
+        from api.benchmark import percentile
+
+        timings = sorted([5.0, 1.0, 9.5, 3.2, 7.7, 2.1, 4.4])
+        cuts = statistics.quantiles(timings, n=100, method='inclusive')
+        for percent in (1, 50, 95, 99):
+            assert percentile(timings, percent) == pytest.approx(
+                cuts[percent - 1]
+            ), 'Проверьте интерполяцию перцентилей'
+        assert percentile([4.0], 95) == 4.0
+
+    @pytest.mark.parametrize('value,scale', [
+        ('10k', 10000), ('1M', 1000000), ('2500', 2500)
+    ])
+    def test_parse_scale(self, value, scale):
+        from reviews.synthetic import parse_scale
+
+        assert parse_scale(value) == scale
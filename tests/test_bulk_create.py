@@ -0,0 +1,201 @@
+import pytest
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def returning_inserts(monkeypatch):
+    """Включает INSERT ... RETURNING на SQLite 3.35+, как в Django 4.0,
+    чтобы проверить путь bulk_insert, который иначе идет только
+    на PostgreSQL. Возвращает список вызовов bulk_insert.
+    """
+    from django.db import connection
+
+    from api.bulk import BulkListSerializer
+
+    if connection.vendor == 'sqlite':
+        ops = connection.ops
+
+        def return_insert_columns(fields):
+            columns = ', '.join(
+                '{}.{}'.format(
+                    ops.quote_name(field.model._meta.db_table),
+                    ops.quote_name(field.column)
+                ) for field in fields
+            )
+            return f'RETURNING {columns}', ()
+
+        monkeypatch.setattr(
+            connection.features, 'can_return_columns_from_insert', True
+        )
+        monkeypatch.setattr(
+            connection.features, 'can_return_rows_from_bulk_insert', True
+        )
+        monkeypatch.setattr(
+            ops, 'return_insert_columns', return_insert_columns
+        )
+        monkeypatch.setattr(
+            ops, 'fetch_returned_insert_rows',
+            lambda cursor: cursor.fetchall(), raising=False
+        )
+    calls = []
+    bulk_insert = BulkListSerializer.bulk_insert
+
+    def spy(self, model, *args):
+        calls.append(model)
+        return bulk_insert(self, model, *args)
+
+    monkeypatch.setattr(BulkListSerializer, 'bulk_insert', spy)
+    return calls
+
+
+@pytest.mark.django_db
+class TestBulkCreate:
+
+    def test_bulk_titles(self, admin_client, category, genre):
+        from reviews.models import Genre, Title
+
+        Genre.objects.create(name='Комедия', slug='comedy')
+        data = [
+            {'name': f'Произведение {i}', 'year': 2000,
+             'category': 'movie', 'genre': ['drama', 'comedy']}
+            for i in range(20)
+        ]
+        response = admin_client.post(TITLES_URL, data, format='json')
+        assert response.status_code == 201
+        assert len(response.json()) == 20
+        assert response.json()[0]['genre'] == ['drama', 'comedy']
+        assert Title.objects.filter(genre__slug='comedy').count() == 20
+
+    def test_bulk_titles_errors_per_item(self, admin_client, category):
+        from reviews.models import Title
+
+        data = [
+            {'name': 'Хорошее', 'year': 2000, 'category': 'movie',
+             'genre': []},
+            {'name': 'Плохое', 'year': 2000, 'category': 'nope',
+             'genre': []},
+        ]
+        response = admin_client.post(TITLES_URL, data, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert 'category' in errors[1]
+        assert not Title.objects.exists()
+
+    def test_bulk_titles_resolve_slugs_once(self, admin_client, category,
+                                            genre):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        data = [
+            {'name': f'Произведение {i}', 'year': 2000,
+             'category': 'movie', 'genre': ['drama']}
+            for i in range(50)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(TITLES_URL, data, format='json')
+        assert response.status_code == 201
+        slug_queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_category"' in query['sql']
+        ]
+        assert len(slug_queries) == 1, (
+            'Проверьте, что слаги категорий загружаются одним запросом'
+        )
+
+    def test_bulk_comments(self, user_client, title, user):
+        from reviews.models import Comment, Review
+
+        review = Review.objects.create(title=title, author=user,
+                                       text='Текст', score=3)
+        url = f'{TITLES_URL}{title.pk}/reviews/{review.pk}/comments/'
+        data = [{'text': f'Комментарий {i}'} for i in range(5)]
+        response = user_client.post(url, data, format='json')
+        assert response.status_code == 201
+        assert Comment.objects.filter(review=review, author=user).count() == 5
+
+    def test_bulk_reviews_update_rating(self, user_client, title):
+        from reviews.models import Title
+
+        url = f'{TITLES_URL}{title.pk}/reviews/'
+        response = user_client.post(
+            url, [{'text': 'Текст', 'score': 9}], format='json'
+        )
+        assert response.status_code == 201
+        assert Title.objects.get(pk=title.pk).rating == 9
+        response = user_client.post(
+            url, [{'text': 'Текст', 'score': 1}], format='json'
+        )
+        assert response.status_code == 400
+
+    def test_bulk_is_admin_only_for_titles(self, user_client):
+        response = user_client.post(TITLES_URL, [], format='json')
+        assert response.status_code == 403
+
+    def test_bulk_insert_updates_title_stats(self, user_client, admin_client,
+                                             another_user, title,
+                                             returning_inserts):
+        from rest_framework.test import APIClient
+
+        from reviews.models import Comment, Review, Title
+
+        data = [
+            {'name': f'Произведение {i}', 'year': 2000,
+             'category': 'movie', 'genre': ['drama']}
+            for i in range(3)
+        ]
+        response = admin_client.post(TITLES_URL, data, format='json')
+        assert response.status_code == 201
+        assert Title.objects.filter(genre__slug='drama').count() == 4
+        another_client = APIClient()
+        another_client.force_authenticate(user=another_user)
+        url = f'{TITLES_URL}{title.pk}/reviews/'
+        for client, score in ((user_client, 10), (another_client, 7)):
+            response = client.post(
+                url, [{'text': 'Текст', 'score': score}], format='json'
+            )
+            assert response.status_code == 201
+        review = Review.objects.filter(title=title).first()
+        response = user_client.post(
+            f'{url}{review.pk}/comments/',
+            [{'text': f'Комментарий {i}'} for i in range(4)], format='json'
+        )
+        assert response.status_code == 201
+        assert returning_inserts == [Title, Review, Review, Comment], (
+            'Проверьте, что объекты вставляются через bulk_insert'
+        )
+        title = Title.objects.get(pk=title.pk)
+        assert (title.rating_count, title.rating_sum) == (2, 17)
+        assert title.rating_avg == 8.5
+        assert (title.score_10, title.score_7) == (1, 1)
+        assert title.comment_count == 4
+        assert title.last_review_at == max(
+            Review.objects.filter(title=title).values_list(
+                'pub_date', flat=True
+            )
+        ), 'Проверьте, что bulk_insert обновляет статистику произведения'
+
+    @pytest.mark.parametrize('bulk', [True, False])
+    def test_other_integrity_errors_are_not_hidden(self, monkeypatch,
+                                                   user_client, title,
+                                                   bulk):
+        from django.db import IntegrityError
+
+        from api.bulk import BulkListSerializer
+        from api.serializers import ReviewSerializer
+
+        def create(self, validated_data):
+            raise IntegrityError(
+                'NOT NULL constraint failed: reviews_review.text'
+            )
+
+        serializer = BulkListSerializer if bulk else ReviewSerializer
+        monkeypatch.setattr(serializer, 'create', create)
+        data = {'text': 'Текст', 'score': 5}
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                f'{TITLES_URL}{title.pk}/reviews/',
+                [data] if bulk else data, format='json'
+            )
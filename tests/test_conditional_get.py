@@ -0,0 +1,143 @@
+import pytest
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def revalidate(client, url, response):
+    headers = {'HTTP_IF_NONE_MATCH': response['ETag']}
+    if response.has_header('Last-Modified'):
+        headers['HTTP_IF_MODIFIED_SINCE'] = response['Last-Modified']
+    return client.get(url, **headers)
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('url', [
+        TITLES_URL, f'{TITLES_URL}{{title}}/',
+        f'{TITLES_URL}{{title}}/reviews/',
+        f'{TITLES_URL}{{title}}/reviews/{{review}}/comments/',
+    ])
+    def test_not_modified(self, client, django_assert_max_num_queries,
+                          title, user, url):
+        from reviews.models import Review
+
+        review = Review.objects.create(title=title, author=user,
+                                       text='Текст', score=5)
+        url = url.format(title=title.pk, review=review.pk)
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('ETag')
+        assert response.has_header('Last-Modified') == (url != TITLES_URL)
+        # Список сверяет количество и страницу произведений.
+        with django_assert_max_num_queries(2 if url == TITLES_URL else 1):
+            assert revalidate(client, url, response).status_code == 304
+
+    def test_review_write_changes_validators(self, client, title, user,
+                                             another_user):
+        from reviews.models import Comment, Review
+
+        review = Review.objects.create(title=title, author=user,
+                                       text='Текст', score=5)
+        urls = [
+            TITLES_URL, f'{TITLES_URL}{title.pk}/',
+            f'{TITLES_URL}{title.pk}/reviews/',
+        ]
+        responses = [client.get(url) for url in urls]
+        Review.objects.create(title=title, author=another_user,
+                              text='Текст', score=7)
+        for url, response in zip(urls, responses):
+            assert revalidate(client, url, response).status_code == 200
+
+        url = f'{TITLES_URL}{title.pk}/reviews/{review.pk}/comments/'
+        response = client.get(url)
+        Comment.objects.create(review=review, author=user, text='Текст')
+        assert revalidate(client, url, response).status_code == 200
+
+    def test_filters_change_etag(self, client, title):
+        first = client.get(TITLES_URL)
+        second = client.get(TITLES_URL, {'year': 1900})
+        assert first['ETag'] != second['ETag']
+
+    def test_title_delete_changes_list_etag(self, client, title,
+                                            django_assert_max_num_queries):
+        from reviews.models import Title
+
+        Title.objects.create(name='Другое', year=2000)
+        response = client.get(TITLES_URL)
+        title.delete()
+        assert revalidate(client, TITLES_URL, response).status_code == 200, (
+            'Проверьте, что удаление произведения меняет ETag списка'
+        )
+        response = client.get(TITLES_URL)
+        with django_assert_max_num_queries(2):
+            assert revalidate(
+                client, TITLES_URL, response
+            ).status_code == 304
+
+    @pytest.mark.parametrize('url', [
+        TITLES_URL, f'{TITLES_URL}{{title}}/',
+    ])
+    def test_category_and_genre_rename_change_validators(self, client,
+                                                         title, category,
+                                                         genre, url):
+        url = url.format(title=title.pk)
+        for related in (category, genre):
+            response = client.get(url)
+            related.name = f'{related.name} (новое)'
+            related.save()
+            assert revalidate(client, url, response).status_code == 200, (
+                'Проверьте, что переименование категории или жанра '
+                'меняет валидаторы произведения'
+            )
+
+    def test_genre_change_changes_validators(self, client, title):
+        from reviews.models import Genre
+
+        url = f'{TITLES_URL}{title.pk}/'
+        response = client.get(url)
+        title.genre.add(Genre.objects.create(name='Комедия', slug='comedy'))
+        assert revalidate(client, url, response).status_code == 200
+
+    def test_rebuild_title_stats_changes_validators(self, client, title,
+                                                    user):
+        from reviews.management.commands.rebuild_title_stats import (
+            rebuild_title_stats, refresh_rating_avg)
+        from reviews.models import Review
+
+        urls = [f'{TITLES_URL}{title.pk}/', f'{TITLES_URL}{title.pk}/reviews/']
+        responses = [client.get(url) for url in urls]
+        Review.objects.bulk_create([
+            Review(title=title, author=user, text='Текст', score=8)
+        ])
+        rebuild_title_stats()
+        refresh_rating_avg()
+        for url, response in zip(urls, responses):
+            assert revalidate(client, url, response).status_code == 200, (
+                'Проверьте, что пересчет статистики меняет валидаторы'
+            )
+
+    @pytest.mark.parametrize('params', [{'limit': 1}, {'cursor': '',
+                                                       'limit': 1}])
+    def test_review_elsewhere_keeps_page_etag(self, client, title, user,
+                                              params):
+        from reviews.models import Review, Title
+
+        other = Title.objects.create(name='Другое', year=2000)
+        response = client.get(TITLES_URL, params)
+        assert [item['id'] for item in response.json()['results']] == [
+            title.pk
+        ]
+        Review.objects.create(title=other, author=user, text='Текст',
+                              score=5)
+        assert client.get(
+            TITLES_URL, params, HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code == 304, (
+            'Проверьте, что отзыв к произведению не со страницы '
+            'не меняет ее ETag'
+        )
+        Review.objects.create(title=title, author=user, text='Текст',
+                              score=5)
+        assert client.get(
+            TITLES_URL, params, HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code == 200
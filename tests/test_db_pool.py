@@ -0,0 +1,101 @@
+import sqlite3
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+
+def connect():
+    return sqlite3.connect(':memory:', check_same_thread=False)
+
+
+class TestConnectionPool:
+
+    def test_reuses_connections(self):
+        from api_yamdb.db_pool.pool import ConnectionPool
+
+        pool = ConnectionPool(max_size=2)
+        first = pool.get(connect)
+        pool.put(first)
+        assert pool.get(connect) is first, (
+            'Проверьте, что пул выдает возвращенное соединение повторно'
+        )
+        stats = pool.get_stats()
+        assert stats['connects'] == 1
+        assert stats['checkouts'] == 2
+        assert stats['in_use'] == 1 and stats['idle'] == 0
+
+    def test_timeout_when_exhausted(self):
+        from api_yamdb.db_pool.pool import ConnectionPool, PoolTimeout
+
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+        pool.get(connect)
+        with pytest.raises(PoolTimeout):
+            pool.get(connect)
+        assert pool.get_stats()['timeouts'] == 1
+
+    def test_waits_for_returned_connection(self):
+        from api_yamdb.db_pool.pool import ConnectionPool
+
+        pool = ConnectionPool(max_size=1, timeout=2)
+        connection = pool.get(connect)
+        timer = threading.Timer(0.05, pool.put, [connection])
+        timer.start()
+        start = time.monotonic()
+        assert pool.get(connect) is connection
+        timer.join()
+        assert time.monotonic() - start < 1, (
+            'Проверьте, что ожидающий запрос получает освободившееся '
+            'соединение'
+        )
+
+    def test_health_check_replaces_broken(self):
+        from api_yamdb.db_pool.pool import ConnectionPool
+
+        pool = ConnectionPool(max_size=1, check_interval=0)
+        broken = pool.get(connect)
+        pool.put(broken)
+        broken.close()
+        connection = pool.get(connect)
+        assert connection is not broken, (
+            'Проверьте, что соединение проверяется перед выдачей из пула'
+        )
+        stats = pool.get_stats()
+        assert stats['failed_checks'] == 1
+        assert stats['connects'] == 2
+        assert stats['in_use'] == 1
+
+    def test_failed_connect_frees_slot(self):
+        from api_yamdb.db_pool.pool import ConnectionPool
+
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+        with pytest.raises(sqlite3.OperationalError):
+            pool.get(mock.Mock(side_effect=sqlite3.OperationalError))
+        assert pool.get(connect) is not None
+
+
+class TestPooledBackend:
+
+    def test_close_returns_connection(self):
+        from django.db.backends.postgresql import base
+
+        from api_yamdb.db_pool.base import DatabaseWrapper
+        from api_yamdb.db_pool.pool import get_pool_stats
+
+        wrapper = DatabaseWrapper({
+            'NAME': 'pool_test', 'USER': 'u', 'HOST': 'h', 'PORT': 1,
+            'POOL': {'MAX_SIZE': 2}, 'OPTIONS': {},
+        }, alias='pool_test')
+        params = {'database': 'pool_test', 'user': 'u', 'host': 'h',
+                  'port': 1}
+        raw = mock.Mock(closed=0)
+        with mock.patch.object(base.DatabaseWrapper, 'get_new_connection',
+                               return_value=raw) as new_connection:
+            wrapper.connection = wrapper.get_new_connection(params)
+            wrapper._close()
+            assert wrapper.get_new_connection(params) is raw
+        new_connection.assert_called_once()
+        raw.close.assert_not_called()
+        stats = get_pool_stats()['pool_test:u@h:1/pool_test']
+        assert stats['max_size'] == 2 and stats['in_use'] == 1
@@ -0,0 +1,63 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+
+@pytest.fixture
+def comment(title, genre, user):
+    from reviews.models import Comment, Review, TitleGenre
+
+    TitleGenre.objects.create(title=title, genre=genre)
+    review = Review.objects.create(
+        title=title, author=user, text='Текст', score=5
+    )
+    return Comment.objects.create(review=review, author=user, text='Текст')
+
+
+def run_command(*args):
+    out = StringIO()
+    call_command('explain_hot_queries', *args, stdout=out)
+    return out.getvalue()
+
+
+def get_section(output, name):
+    lines = output.splitlines()
+    start = lines.index(next(
+        line for line in lines if line.startswith(f'{name}: ')
+    ))
+    section = []
+    for line in lines[start + 1:]:
+        if not line.startswith(' '):
+            break
+        section.append(line)
+    return section
+
+
+@pytest.mark.django_db
+class TestExplainHotQueries:
+
+    def test_reports_every_hot_query(self, comment):
+        from api.management.commands.explain_hot_queries import HOT_QUERIES
+
+        output = run_command()
+        for name, path, params in HOT_QUERIES:
+            assert get_section(output, name), (
+                f'Проверьте, что команда выводит планы для `{name}`'
+            )
+        assert 'queries use sequential scans' in output
+
+    def test_nested_lists_use_indexes(self, comment):
+        output = run_command()
+        for name in ('reviews', 'comments', 'review', 'comment'):
+            assert all(
+                line.strip().startswith('ok')
+                for line in get_section(output, name)
+            ), f'Проверьте индексы для запросов `{name}`'
+
+    def test_fail_on_seq_scan(self, comment):
+        # Полный список произведений читает всю таблицу.
+        output = run_command()
+        assert 'SEQ SCAN' in ''.join(get_section(output, 'titles'))
+        with pytest.raises(CommandError):
+            run_command('--fail-on-seq-scan')
@@ -0,0 +1,134 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+EXPORT_URL = '/api/v1/titles/export/'
+
+
+@pytest.fixture
+def review(title, user):
+    from reviews.models import Comment, Review
+
+    review = Review.objects.create(title=title, author=user, text='Текст',
+                                   score=7)
+    Comment.objects.create(review=review, author=user, text='Комментарий')
+    return review
+
+
+def read_stream(response):
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_export_is_admin_only(self, client, user_client):
+        assert client.get(EXPORT_URL).status_code == 401
+        assert user_client.get(EXPORT_URL).status_code == 403
+
+    def test_export_ndjson(self, admin_client, title, review):
+        response = admin_client.get(EXPORT_URL, {'reviews': 1})
+        assert response.status_code == 200
+        assert response.streaming
+        records = [json.loads(line)
+                   for line in read_stream(response).splitlines()]
+        assert len(records) == 1
+        assert records[0]['genre'] == ['drama']
+        assert records[0]['category'] == 'movie'
+        assert records[0]['rating'] == 7
+        assert records[0]['reviews'][0]['comments'][0]['text'] == (
+            'Комментарий'
+        )
+
+    def test_export_csv(self, admin_client, title):
+        response = admin_client.get(EXPORT_URL, {'output': 'csv'})
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        assert rows[0]['name'] == title.name
+        assert 'reviews' not in rows[0]
+
+    def test_export_unknown_format(self, admin_client):
+        response = admin_client.get(EXPORT_URL, {'output': 'xml'})
+        assert response.status_code == 400
+
+    def test_export_command(self, title, review):
+        from reviews.models import Title
+
+        Title.objects.create(name='Второе', year=2000)
+        output = io.StringIO()
+        call_command('export_catalog', reviews=True, chunk_size=1,
+                     stdout=output)
+        records = [json.loads(line)
+                   for line in output.getvalue().splitlines()]
+        assert [record['name'] for record in records] == [
+            title.name, 'Второе'
+        ]
+        assert records[1]['reviews'] == []
+
+    @pytest.mark.parametrize('export_format', ['ndjson', 'csv'])
+    def test_reviews_are_streamed(self, monkeypatch, title, user,
+                                  another_user, export_format):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from reviews import export
+        from reviews.models import Comment, Review, Title
+
+        monkeypatch.setattr(export, 'ITERATOR_CHUNK_SIZE', 2)
+        Title.objects.create(name='Без отзывов', year=2000)
+        third = Title.objects.create(name='Третье', year=2000)
+        now = timezone.now()
+        expected = {title.pk: [], third.pk: []}
+        for number, (target, author) in enumerate([
+                (third, user), (title, another_user), (title, user),
+                (third, another_user)]):
+            review = Review.objects.create(
+                title=target, author=author, text=f'Отзыв "{number}", да',
+                score=number + 1
+            )
+            Review.objects.filter(pk=review.pk).update(
+                pub_date=now - timedelta(days=number)
+            )
+            comments = [
+                Comment.objects.create(review=review, author=user,
+                                       text=f'Комментарий {index}').pk
+                for index in range(number)
+            ]
+            expected[target.pk].insert(0, (review.pk, comments))
+        lines = ''.join(export.export_catalog(
+            export_format, include_reviews=True, chunk_size=2
+        ))
+        if export_format == 'csv':
+            records = list(csv.DictReader(io.StringIO(lines)))
+            for record in records:
+                record['id'] = int(record['id'])
+                record['reviews'] = json.loads(record['reviews'])
+        else:
+            records = [json.loads(line) for line in lines.splitlines()]
+        exported = {
+            record['id']: [
+                (review['id'], [comment['id']
+                                for comment in review['comments']])
+                for review in record['reviews']
+            ] for record in records
+        }
+        assert len(records) == 3
+        assert exported[title.pk] == expected[title.pk], (
+            'Проверьте, что отзывы выгружаются по дате с комментариями'
+        )
+        assert exported[third.pk] == expected[third.pk]
+        assert records[0]['reviews'][0]['text'] == 'Отзыв "2", да'
+
+    def test_reviews_are_not_materialized(self, title, review):
+        from collections.abc import Iterator
+
+        from reviews.export import iter_titles
+
+        record = next(iter_titles(include_reviews=True))
+        assert isinstance(record['reviews'], Iterator), (
+            'Проверьте, что отзывы не собираются в список'
+        )
+        assert isinstance(next(record['reviews'])['comments'], Iterator)
@@ -0,0 +1,66 @@
+import statistics
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+def review_counts():
+    from reviews.models import Title
+
+    return sorted(
+        Title.objects.values_list('rating_count', flat=True), reverse=True
+    )
+
+
+@pytest.mark.django_db
+class TestGenerateData:
+
+    def test_zipf_skew(self):
+        from django.db.models import Count
+
+        from reviews.models import Review
+
+        call_command('generate_data', reviews='2000', titles='100',
+                     users='200', skew=1.2)
+        counts = review_counts()
+        assert sum(counts) == Review.objects.count() == 2000
+        assert counts[0] > 10 * statistics.median(counts), (
+            'Проверьте, что отзывы распределены по произведениям по Ципфу'
+        )
+        authors = sorted(
+            Review.objects.values('author').annotate(
+                count=Count('id')
+            ).values_list('count', flat=True),
+            reverse=True
+        )
+        assert authors[0] > 5 * statistics.median(authors), (
+            'Проверьте, что среди авторов есть самые активные'
+        )
+
+    def test_uniform_without_skew(self):
+        call_command('generate_data', reviews='2000', titles='100', skew=0)
+        counts = review_counts()
+        assert counts[0] < 3 * statistics.median(counts), (
+            'Проверьте, что при --skew 0 отзывы распределены равномерно'
+        )
+
+    def test_same_seed_same_rows(self):
+        from reviews.models import Review
+
+        call_command('generate_data', reviews='1k', seed=3)
+        first = list(Review.objects.order_by('pk').values_list(
+            'title_id', 'author_id', 'score', 'pub_date'
+        ))
+        call_command('generate_data', reviews='1k', seed=3, clear=True)
+        second = list(Review.objects.order_by('pk').values_list(
+            'title_id', 'author_id', 'score', 'pub_date'
+        ))
+        assert len(first) == 1000
+        assert first == second, (
+            'Проверьте, что данные детерминированы по seed'
+        )
+
+    def test_invalid_scale(self):
+        with pytest.raises(CommandError):
+            call_command('generate_data', reviews='many')
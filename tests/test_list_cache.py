@@ -0,0 +1,45 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestListCache:
+
+    @pytest.mark.parametrize('url', ['/api/v1/categories/', '/api/v1/genres/'])
+    def test_list_is_cached(self, client, django_assert_num_queries,
+                            category, genre, url):
+        first = client.get(url, {'limit': 5}).json()
+        with django_assert_num_queries(0):
+            second = client.get(url, {'limit': 5}).json()
+        assert first == second
+        assert client.get(url, {'search': 'нет такого'}).json()['count'] == 0
+
+    def test_create_and_destroy_invalidate(self, client, admin_client,
+                                           category):
+        url = '/api/v1/categories/'
+        assert client.get(url).json()['count'] == 1
+        response = admin_client.post(url, {'name': 'Книга', 'slug': 'book'})
+        assert response.status_code == 201
+        assert client.get(url).json()['count'] == 2
+        admin_client.delete(f'{url}book/')
+        assert client.get(url).json()['count'] == 1
+
+    def test_evicted_version_does_not_serve_stale_list(self, client,
+                                                       admin_client,
+                                                       category):
+        from django.core.cache import cache
+
+        url = '/api/v1/categories/'
+        assert client.get(url).json()['count'] == 1
+        response = admin_client.post(url, {'name': 'Книга', 'slug': 'book'})
+        assert response.status_code == 201
+        cache.delete('list:category:version')
+        assert client.get(url).json()['count'] == 2, (
+            'После вытеснения номера версии не должен отдаваться '
+            'старый ответ из кэша'
+        )
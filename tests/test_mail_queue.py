@@ -0,0 +1,90 @@
+from smtplib import SMTPRecipientsRefused
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+
+
+class FlakyBackend(EmailBackend):
+    """Падает на второй попытке отправки."""
+    attempts = 0
+
+    def send_messages(self, messages):
+        FlakyBackend.attempts += 1
+        if FlakyBackend.attempts == 2:
+            raise ConnectionError('SMTP is down')
+        return super().send_messages(messages)
+
+
+class RefusingBackend(EmailBackend):
+    """Отклоняет письма на адреса в домене bad.fake."""
+    attempts = 0
+
+    def send_messages(self, messages):
+        RefusingBackend.attempts += 1
+        for message in messages:
+            if message.to[0].endswith('@bad.fake'):
+                raise SMTPRecipientsRefused(
+                    {message.to[0]: (550, b'No such user')}
+                )
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def mail_settings(settings):
+    settings.MAIL_QUEUE = {**settings.MAIL_QUEUE, 'ASYNC': True,
+                           'BACKOFF': 0}
+    return settings
+
+
+@pytest.mark.django_db
+class TestMailQueue:
+
+    def test_signup_sends_mail_in_background(self, client, mail_settings):
+        from users.mail import mail_queue
+
+        response = client.post(
+            SIGNUP_URL, {'email': 'new@yamdb.fake', 'username': 'newbie'}
+        )
+        assert response.status_code == 200
+        assert mail_queue.flush(timeout=5)
+        assert len(mail.outbox) == 1
+        assert 'confirmation_code' in mail.outbox[0].body
+
+    def test_retry_and_batch(self, mail_settings):
+        from django.core.mail import EmailMessage
+        from users.mail import mail_queue
+
+        mail_settings.EMAIL_BACKEND = 'tests.test_mail_queue.FlakyBackend'
+        FlakyBackend.attempts = 0
+        batch = [
+            EmailMessage('Тема', 'Текст', 'from@yamdb.fake', ['to@yamdb.fake'])
+            for _ in range(3)
+        ]
+        mail_queue.deliver(batch)
+        assert FlakyBackend.attempts == 4, (
+            'Повторно должны отправляться только неотправленные письма'
+        )
+        assert len(mail.outbox) == 3, 'Письма не должны дублироваться'
+
+    def test_refused_recipient_is_not_retried(self, mail_settings):
+        from django.core.mail import EmailMessage
+        from users.mail import mail_queue
+
+        mail_settings.EMAIL_BACKEND = 'tests.test_mail_queue.RefusingBackend'
+        RefusingBackend.attempts = 0
+        batch = [
+            EmailMessage('Тема', 'Текст', 'from@yamdb.fake', [address])
+            for address in (
+                'one@yamdb.fake', 'nobody@bad.fake', 'two@yamdb.fake'
+            )
+        ]
+        mail_queue.deliver(batch)
+        assert RefusingBackend.attempts == 3, (
+            'Письмо с отклоненным адресом не должно повторяться'
+        )
+        assert [message.to[0] for message in mail.outbox] == [
+            'one@yamdb.fake', 'two@yamdb.fake'
+        ], 'Остальные письма пачки должны быть отправлены'
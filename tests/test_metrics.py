@@ -0,0 +1,143 @@
+import multiprocessing
+import os
+from unittest import mock
+
+import pytest
+from django.test import Client
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    settings.METRICS = {**settings.METRICS, 'ENABLED': True,
+                        'DIR': str(tmp_path)}
+    return str(tmp_path)
+
+
+def write_in_child(directory):
+    from api.metrics import MetricsStore, sample_key
+
+    store = MetricsStore(directory)
+    store.counters.inc(sample_key('http_requests_total', view='x'), 2)
+    store.gauges.inc(sample_key('http_requests_in_flight'), 5)
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_request_metrics(self, metrics_dir, title):
+        client = Client()
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert (
+            'http_requests_total{method="GET",status="200",'
+            'view="api:title-list"} 2.0'
+        ) in text, 'Проверьте, что ответы считаются по представлениям'
+        assert (
+            'http_request_duration_seconds_count{method="GET",'
+            'view="api:title-list"} 2.0'
+        ) in text
+        assert (
+            'http_request_duration_seconds_bucket{le="+Inf",method="GET",'
+            'view="api:title-list"} 2.0'
+        ) in text
+        assert '# TYPE http_request_db_queries histogram' in text
+        assert 'http_requests_in_flight 1.0' in text, (
+            'Проверьте, что учитывается запрос к /metrics в обработке'
+        )
+
+    def test_aggregates_processes(self, metrics_dir):
+        from api.metrics import collect, get_store, sample_key
+
+        key = sample_key('http_requests_total', view='x')
+        get_store().counters.inc(key, 3)
+        get_store().gauges.inc(sample_key('http_requests_in_flight'))
+        process = multiprocessing.get_context('fork').Process(
+            target=write_in_child, args=(metrics_dir,)
+        )
+        process.start()
+        process.join()
+        totals = collect(metrics_dir)
+        assert totals[key] == 5, (
+            'Проверьте, что счетчики суммируются по всем воркерам'
+        )
+        assert totals[sample_key('http_requests_in_flight')] == 1, (
+            'Проверьте, что gauge завершенных воркеров не учитываются'
+        )
+        child_files = [
+            name for name in os.listdir(metrics_dir)
+            if name.endswith(f'_{process.pid}.db')
+        ]
+        assert child_files == [], (
+            'Проверьте, что файлы завершенных воркеров удаляются'
+        )
+        assert collect(metrics_dir)[key] == 5, (
+            'Проверьте, что счетчики завершенных воркеров сохраняются'
+        )
+
+    def test_store_grows(self, tmp_path):
+        from api.metrics import INITIAL_SIZE, MmapValues, parse_values
+
+        path = str(tmp_path / 'counter_1.db')
+        values = MmapValues(path)
+        for index in range(5000):
+            values.inc(f'key-{index}', index)
+        assert len(values.memory) > INITIAL_SIZE
+        reopened = MmapValues(path)
+        reopened.inc('key-10')
+        with open(path, 'rb') as file:
+            stored = {
+                key: value for key, _, value in parse_values(file.read())
+            }
+        assert len(stored) == 5000
+        assert stored['key-10'] == 11, (
+            'Проверьте, что значения сохраняются в файле между запусками'
+        )
+
+    def test_disabled(self, settings):
+        settings.METRICS = {**settings.METRICS, 'ENABLED': False}
+        assert Client().get('/metrics').status_code == 404
+
+    def test_disabled_by_default(self):
+        from django.conf import settings
+
+        assert settings.METRICS['ENABLED'] is False, (
+            'Проверьте, что метрики по умолчанию выключены'
+        )
+
+    def test_dir_required(self, settings):
+        from django.core.exceptions import ImproperlyConfigured
+
+        from api.metrics import MetricsMiddleware
+
+        settings.METRICS = {**settings.METRICS, 'ENABLED': True, 'DIR': ''}
+        with pytest.raises(ImproperlyConfigured):
+            MetricsMiddleware(lambda request: None)
+
+    def test_token(self, metrics_dir, settings):
+        settings.METRICS = {**settings.METRICS, 'TOKEN': 'secret'}
+        client = Client()
+        assert client.get('/metrics').status_code == 403
+        assert client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer wrong'
+        ).status_code == 403
+        assert client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer secret'
+        ).status_code == 200
+
+    def test_pool_stats(self, metrics_dir):
+        from api_yamdb.db_pool.pool import get_pool
+
+        pool = get_pool('metrics-test', max_size=3)
+        pool.put(pool.get(lambda: mock.Mock()))
+        client = Client()
+        client.get('/api/v1/genres/')
+        text = client.get('/metrics').content.decode()
+        assert 'db_pool_max_connections{pool="metrics-test"} 3.0' in text
+        assert 'db_pool_connects_total{pool="metrics-test"} 1.0' in text
+        assert (
+            'db_pool_connections{pool="metrics-test",state="idle"} 1.0'
+        ) in text, 'Проверьте, что статистика пула попадает в метрики'
@@ -0,0 +1,59 @@
+import pytest
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def titles(category):
+    from reviews.models import Title
+
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {i}', year=2000, category=category)
+        for i in range(150)
+    )
+    return list(Title.objects.order_by('id'))
+
+
+@pytest.fixture
+def reviews(title, django_user_model):
+    from reviews.models import Review
+
+    for i in range(15):
+        author = django_user_model.objects.create(
+            username=f'author{i}', email=f'author{i}@yamdb.fake'
+        )
+        Review.objects.create(title=title, author=author, text='Текст',
+                              score=5)
+    return list(title.reviews.order_by('-pub_date', '-id'))
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_title_cursor_walks_all_pages(self, client, titles):
+        url, ids = f'{TITLES_URL}?cursor=&limit=40', []
+        while url:
+            data = client.get(url).json()
+            assert 'count' not in data, (
+                'Проверьте, что курсорная пагинация не считает COUNT(*)'
+            )
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+        assert ids == [title.id for title in titles]
+
+    def test_cursor_limit_is_capped(self, client, titles):
+        data = client.get(TITLES_URL, {'cursor': '', 'limit': 1000}).json()
+        assert len(data['results']) == 100
+
+    def test_limit_offset_unchanged(self, client, titles):
+        data = client.get(TITLES_URL, {'limit': 1000}).json()
+        assert data['count'] == 150
+        assert len(data['results']) == 150
+        assert data['next'] is None
+
+    def test_review_cursor(self, client, title, reviews):
+        url = f'{TITLES_URL}{title.pk}/reviews/?cursor=&limit=10'
+        first = client.get(url).json()
+        second = client.get(first['next']).json()
+        ids = [item['id'] for item in first['results'] + second['results']]
+        assert ids == [review.id for review in reviews]
@@ -0,0 +1,283 @@
+import pytest
+from django.core.management import call_command, load_command_class
+
+CSV_FILES = {
+    'populate_users': (
+        'users.csv',
+        'id,username,email,role,bio,first_name,last_name\n'
+        '100,bingobongo,bingobongo@yamdb.fake,user,,,\n'
+        '101,capt_obvious,capt_obvious@yamdb.fake,admin,,,\n'
+    ),
+    'populate_genre': (
+        'genre.csv', 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n'
+    ),
+    'populate_category': (
+        'category.csv', 'id,name,slug\n1,Фильм,movie\n2,Книга,book\n'
+    ),
+    'populate_title': (
+        'titles.csv',
+        'id,name,year,category\n1,Побег из Шоушенка,1994,1\n'
+        '2,Крестный отец,1972,1\n'
+    ),
+    'populate_genretitle': (
+        'genre_title.csv', 'id,title_id,genre_id\n1,1,1\n2,2,1\n3,2,2\n'
+    ),
+    'populate_review': (
+        'review.csv',
+        'id,title_id,text,author,score,pub_date\n'
+        '1,1,Текст,100,10,2019-09-24T21:08:21.567Z\n'
+        '2,1,Текст,101,6,2019-09-25T21:08:21.567Z\n'
+    ),
+    'populate_comment': (
+        'comments.csv',
+        'id,review_id,text,author,pub_date\n'
+        '1,1,Текст,101,2019-09-26T21:08:21.567Z\n'
+    ),
+}
+
+
+@pytest.fixture
+def csv_files(tmp_path):
+    paths = {}
+    for command, (filename, content) in CSV_FILES.items():
+        path = tmp_path / filename
+        path.write_text(content, encoding='utf-8')
+        paths[command] = str(path)
+    return paths
+
+
+@pytest.mark.django_db
+class TestPopulate:
+
+    def test_populate_all(self, csv_files):
+        from reviews.models import Comment, Review, Title, TitleGenre
+
+        for command, path in csv_files.items():
+            call_command(command, path, batch_size=1)
+        assert TitleGenre.objects.count() == 3
+        assert Comment.objects.count() == 1
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что дата публикации берется из csv-файла'
+        )
+        assert Title.objects.get(pk=1).rating == 8, (
+            'Проверьте, что рейтинг пересчитывается после загрузки отзывов'
+        )
+        assert Title.objects.create(name='Новое', year=2000).pk == 3, (
+            'Проверьте, что последовательность id сдвигается после загрузки'
+        )
+
+    def test_unknown_relation(self, csv_files, tmp_path):
+        from django.core.management.base import CommandError
+
+        call_command('populate_category', csv_files['populate_category'])
+        path = tmp_path / 'broken.csv'
+        path.write_text('id,name,year,category\n1,Фильм,1994,42\n',
+                        encoding='utf-8')
+        with pytest.raises(CommandError):
+            call_command('populate_title', str(path))
+
+    def test_populate_db(self, csv_files, monkeypatch):
+        from reviews.management.commands import populate_db
+        from reviews.models import Comment, Title
+
+        monkeypatch.setattr(populate_db, 'COMMANDS', csv_files)
+        call_command('populate_db', jobs=4)
+        assert Comment.objects.count() == 1
+        assert Title.objects.get(pk=1).rating == 8
+
+    def test_standalone_clear_keeps_dependents(self, csv_files):
+        from reviews.models import Category, Review, Title
+
+        for command, path in csv_files.items():
+            call_command(command, path)
+        call_command('populate_category', csv_files['populate_category'])
+        assert Title.objects.count() == 2, (
+            'Проверьте, что загрузка категорий не удаляет произведения'
+        )
+        assert Title.objects.filter(category__isnull=True).count() == 2
+        assert Category.objects.count() == 2
+        call_command('populate_users', csv_files['populate_users'])
+        assert not Review.objects.exists()
+        title = Title.objects.get(pk=1)
+        stats = (title.rating_count, title.rating_sum, title.comment_count)
+        assert stats == (0, 0, 0), (
+            'Проверьте, что статистика произведений обновляется '
+            'при удалении отзывов загрузчиком'
+        )
+
+    def test_loader_keeps_other_dates(self, csv_files, monkeypatch):
+        from django.utils import timezone
+
+        from reviews.models import Review, Title
+        from users.models import User
+
+        for command in ('populate_users', 'populate_category',
+                        'populate_title'):
+            call_command(command, csv_files[command])
+        saved = []
+        build_object = load_command_class(
+            'reviews', 'populate_review'
+        ).build_object.__func__
+
+        def build_and_save(self, row, relations):
+            # Обычное сохранение посреди загрузки получает текущую дату.
+            if not saved:
+                saved.append(Review.objects.create(
+                    id=1000, title=Title.objects.get(pk=2),
+                    author=User.objects.get(pk=100),
+                    text='Текст', score=5
+                ))
+            return build_object(self, row, relations)
+
+        monkeypatch.setattr(
+            type(load_command_class('reviews', 'populate_review')),
+            'build_object', build_and_save
+        )
+        call_command('populate_review', csv_files['populate_review'])
+        assert Review.objects.get(pk=1).pub_date.year == 2019
+        assert saved[0].pub_date.date() == timezone.now().date(), (
+            'Проверьте, что загрузка не отключает дату публикации '
+            'у других сохранений'
+        )
+
+    def test_full_clear_truncates_together(self, monkeypatch):
+        from unittest import mock
+
+        from django.db import connection
+
+        from reviews.management.commands import populate_db
+
+        truncate = mock.Mock()
+        monkeypatch.setattr(populate_db, 'truncate_models', truncate)
+        monkeypatch.setattr(connection, 'vendor', 'postgresql')
+        populate_db.clear_models()
+        truncate.assert_called_once()
+        models = {model.__name__ for model in truncate.call_args[0][0]}
+        assert models == {
+            'User', 'Genre', 'Category', 'Title', 'TitleGenre', 'Review',
+            'Comment',
+        }, 'Проверьте, что TRUNCATE очищает все таблицы загрузчиков разом'
+
+
+class TestPopulateDbDependencies:
+
+    def test_load_order(self):
+        from reviews.management.commands import populate_db
+
+        dependencies = populate_db.get_dependencies(populate_db.get_loaders())
+        assert dependencies['populate_users'] == set()
+        assert dependencies['populate_genretitle'] == {
+            'populate_title', 'populate_genre'
+        }
+        order = populate_db.get_load_order(dependencies)
+        for command, required in dependencies.items():
+            assert all(
+                order.index(other) < order.index(command)
+                for other in required
+            )
+
+
+class TestParallelPopulate:
+
+    @pytest.fixture
+    def loaders(self, monkeypatch):
+        """Заглушки загрузчиков на пути PostgreSQL: записывают начало
+        и конец загрузки, команда из failing падает в своем потоке.
+        """
+        import threading
+        import time
+
+        from django.db import connection
+
+        from reviews.management.commands import populate_db
+
+        events, lock = [], threading.Lock()
+        failing = set()
+
+        def call_command(command, csv, **kwargs):
+            with lock:
+                events.append(('start', command))
+            time.sleep(0.01)
+            if command in failing:
+                raise ValueError(f'{csv} is broken')
+            kwargs['stdout'].write(f'{command} loaded\n')
+            with lock:
+                events.append(('end', command))
+
+        monkeypatch.setattr(populate_db, 'call_command', call_command)
+        monkeypatch.setattr(populate_db, 'clear_models', lambda: None)
+        monkeypatch.setattr(connection, 'vendor', 'postgresql')
+        return events, failing
+
+    def test_dependencies_finish_first(self, loaders):
+        import io
+
+        from reviews.management.commands import populate_db
+
+        events, _ = loaders
+        output = io.StringIO()
+        call_command('populate_db', jobs=3, stdout=output)
+        dependencies = populate_db.get_dependencies(populate_db.get_loaders())
+        assert {command for _, command in events} == set(dependencies)
+        for command, required in dependencies.items():
+            start = events.index(('start', command))
+            for other in required:
+                assert events.index(('end', other)) < start, (
+                    f'Проверьте, что {command} запускается после {other}'
+                )
+        assert 'populate_comment loaded' in output.getvalue()
+        first = [command for kind, command in events[:3] if kind == 'start']
+        assert len(first) > 1, (
+            'Проверьте, что независимые загрузчики идут параллельно'
+        )
+
+    def test_worker_error_propagates(self, loaders):
+        from django.core.management.base import CommandError
+
+        events, failing = loaders
+        failing.add('populate_title')
+        with pytest.raises(CommandError, match='populate_title'):
+            call_command('populate_db', jobs=3)
+        started = {command for kind, command in events if kind == 'start'}
+        assert not started & {
+            'populate_genretitle', 'populate_review', 'populate_comment'
+        }, 'Проверьте, что зависимые загрузчики не запускаются после ошибки'
+
+
+@pytest.mark.django_db
+class TestResumablePopulate:
+
+    def test_resume_after_failure(self, csv_files, tmp_path):
+        from django.core.management.base import CommandError
+        from reviews.models import Category, Title
+
+        call_command('populate_category', csv_files['populate_category'])
+        path = tmp_path / 'titles_resume.csv'
+        path.write_text(
+            'id,name,year,category\n1,Первое,1994,1\n2,Второе,1995,2\n'
+            '3,Третье,1996,9\n4,Четвертое,1997,1\n',
+            encoding='utf-8'
+        )
+        with pytest.raises(CommandError):
+            call_command('populate_title', str(path), resume=True,
+                         batch_size=1)
+        assert set(Title.objects.values_list('pk', flat=True)) == {1, 2}
+        assert (tmp_path / 'titles_resume.csv.checkpoint').exists()
+
+        Category.objects.create(pk=9, name='Музыка', slug='music')
+        Title.objects.filter(pk=1).update(name='Изменено')
+        call_command('populate_title', str(path), resume=True, batch_size=1)
+        assert Title.objects.count() == 4
+        assert Title.objects.get(pk=1).name == 'Изменено', (
+            'Проверьте, что загрузка продолжается с контрольной точки'
+        )
+        assert not (tmp_path / 'titles_resume.csv.checkpoint').exists()
+
+    def test_resume_skips_existing_rows(self, csv_files):
+        from reviews.models import Category
+
+        call_command('populate_category', csv_files['populate_category'])
+        call_command('populate_category', csv_files['populate_category'],
+                     resume=True, clear=False)
+        assert Category.objects.count() == 2
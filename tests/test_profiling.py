@@ -0,0 +1,75 @@
+import json
+import logging
+
+import pytest
+from django.test import Client
+
+
+@pytest.fixture
+def profiling(settings):
+    settings.PROFILING = {
+        **settings.PROFILING, 'ENABLED': True, 'SLOW_REQUEST_MS': 0,
+    }
+    return settings.PROFILING
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+
+    def test_disabled_by_default(self):
+        from django.core.exceptions import MiddlewareNotUsed
+
+        from api.profiling import ProfilingMiddleware
+
+        with pytest.raises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+        response = Client().get('/api/v1/genres/')
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что без PROFILING заголовок Server-Timing не выводится'
+        )
+
+    def test_server_timing(self, profiling, title):
+        response = Client().get('/api/v1/titles/')
+        assert response.status_code == 200
+        timing = response['Server-Timing']
+        for name in ('db;dur=', 'total;dur=', 'app;dur=', 'render;dur='):
+            assert name in timing, (
+                f'Проверьте, что Server-Timing содержит {name}'
+            )
+        assert 'queries, 0 duplicates' in timing
+
+    def test_duplicates(self):
+        from api.profiling import RequestProfile
+
+        profile = RequestProfile()
+        for sql in ('SELECT 1', 'SELECT 2', 'SELECT 1', 'SELECT 1'):
+            profile(lambda *args: None, sql, (), False, {})
+        profile.finish()
+        assert profile.queries == 4
+        assert profile.duplicates == 2, (
+            'Проверьте, что повторы одного SQL-запроса считаются'
+        )
+        assert profile.get_top_queries(1)[0]['count'] == 3
+
+    def test_slow_request_logged(self, profiling, title, caplog):
+        with caplog.at_level(logging.WARNING, logger='api.profiling'):
+            Client().get('/api/v1/titles/')
+        records = [
+            json.loads(record.getMessage()) for record in caplog.records
+            if record.name == 'api.profiling'
+        ]
+        assert len(records) == 1, (
+            'Проверьте, что медленный запрос записывается в журнал'
+        )
+        assert records[0]['path'] == '/api/v1/titles/'
+        assert records[0]['queries'] >= 1
+        assert records[0]['top_queries'][0]['sql']
+
+    def test_sampling(self, profiling, title, caplog):
+        profiling['SAMPLE_RATE'] = 0
+        with caplog.at_level(logging.WARNING, logger='api.profiling'):
+            Client().get('/api/v1/titles/')
+        assert not [
+            record for record in caplog.records
+            if record.name == 'api.profiling'
+        ], 'Проверьте, что SAMPLE_RATE=0 не пишет запросы в журнал'
@@ -0,0 +1,108 @@
+import pytest
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def many_titles(category, genre):
+    from reviews.models import Genre, Title, TitleGenre
+
+    another_genre = Genre.objects.create(name='Комедия', slug='comedy')
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {i}', year=2000, category=category)
+        for i in range(1000)
+    )
+    titles = list(Title.objects.order_by('pk'))
+    TitleGenre.objects.bulk_create(
+        TitleGenre(title=title, genre=current_genre)
+        for title in titles
+        for current_genre in (genre, another_genre)
+    )
+    return titles
+
+
+@pytest.mark.django_db
+class TestTitleQueryBudget:
+
+    @pytest.mark.parametrize('limit', [10, 100, 1000])
+    def test_title_list(self, client, django_assert_max_num_queries,
+                        many_titles, limit):
+        with django_assert_max_num_queries(4):
+            response = client.get(TITLES_URL, {'limit': limit})
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == limit
+        assert len(results[0]['genre']) == 2
+
+    @pytest.mark.parametrize('limit', [10, 100, 1000])
+    def test_title_retrieve(self, client, django_assert_max_num_queries,
+                            many_titles, limit):
+        title = many_titles[limit - 1]
+        with django_assert_max_num_queries(3):
+            response = client.get(f'{TITLES_URL}{title.pk}/')
+        assert response.status_code == 200
+        assert response.json()['category']['slug'] == 'movie'
+
+
+@pytest.fixture
+def many_reviews(title, django_user_model):
+    from reviews.management.commands.rebuild_title_stats import \
+        rebuild_title_stats
+    from reviews.models import Comment, Review
+
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'reader{i}', email=f'reader{i}@yamdb.fake')
+        for i in range(100)
+    )
+    authors = list(django_user_model.objects.filter(
+        username__startswith='reader'
+    ))
+    Review.objects.bulk_create(
+        Review(title=title, author=author, text='Текст', score=5)
+        for author in authors
+    )
+    review = Review.objects.filter(title=title).first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author=author, text='Комментарий')
+        for author in authors
+    )
+    rebuild_title_stats()
+    return review
+
+
+@pytest.mark.django_db
+class TestReviewQueryBudget:
+
+    @pytest.mark.parametrize('limit', [10, 100])
+    def test_review_list(self, client, django_assert_max_num_queries,
+                         title, many_reviews, limit):
+        url = f'{TITLES_URL}{title.pk}/reviews/'
+        with django_assert_max_num_queries(4):
+            response = client.get(url, {'limit': limit})
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == limit
+        assert results[0]['author'].startswith('reader')
+
+    @pytest.mark.parametrize('limit', [10, 100])
+    def test_comment_list(self, client, django_assert_max_num_queries,
+                          title, many_reviews, limit):
+        url = f'{TITLES_URL}{title.pk}/reviews/{many_reviews.pk}/comments/'
+        with django_assert_max_num_queries(4):
+            response = client.get(url, {'limit': limit})
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == limit
+        assert results[0]['author'].startswith('reader')
+
+    def test_review_update_by_author(self, title, many_reviews,
+                                     django_assert_max_num_queries):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(user=many_reviews.author)
+        url = f'{TITLES_URL}{title.pk}/reviews/{many_reviews.pk}/'
+        # Произведение, отзыв с автором, UPDATE отзыва и рейтинга.
+        with django_assert_max_num_queries(4):
+            response = client.patch(url, {'score': 7})
+        assert response.status_code == 200
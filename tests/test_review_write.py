@@ -0,0 +1,93 @@
+import pytest
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def review(title, another_user):
+    from reviews.models import Review
+
+    return Review.objects.create(
+        title=title, author=another_user, text='Текст', score=5
+    )
+
+
+def count_queries(context):
+    # Точки сохранения есть только внутри тестовой транзакции.
+    return sum(
+        'SAVEPOINT' not in query['sql'] for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db
+class TestReviewWritePath:
+
+    def test_review_create_queries(self, user_client, title):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                f'{TITLES_URL}{title.pk}/reviews/',
+                {'text': 'Текст', 'score': 8}
+            )
+        assert response.status_code == 201, (
+            'Проверьте, что отзыв создается'
+        )
+        assert response.json()['author'] == 'TestUser'
+        # Произведение, вставка отзыва и пересчет рейтинга.
+        assert count_queries(context) == 3, (
+            'Проверьте, что произведение загружается один раз, '
+            'а уникальность проверяет база'
+        )
+
+    def test_second_review_rejected(self, user_client, title):
+        url = f'{TITLES_URL}{title.pk}/reviews/'
+        user_client.post(url, {'text': 'Текст', 'score': 8})
+        response = user_client.post(url, {'text': 'Еще', 'score': 2})
+        assert response.status_code == 400, (
+            'Проверьте, что второй отзыв на произведение отклоняется'
+        )
+        assert response.json() == {'non_field_errors': [
+            'Нельзя оставлять больше одного отзыва на произведение'
+        ]}
+        assert user_client.get(url).json()['count'] == 1
+
+    def test_review_update_allowed(self, user_client, title):
+        url = f'{TITLES_URL}{title.pk}/reviews/'
+        review_id = user_client.post(
+            url, {'text': 'Текст', 'score': 8}
+        ).json()['id']
+        response = user_client.patch(f'{url}{review_id}/', {'score': 3})
+        assert response.status_code == 200
+
+    def test_review_missing_title(self, user_client):
+        response = user_client.post(
+            f'{TITLES_URL}0/reviews/', {'text': 'Текст', 'score': 8}
+        )
+        assert response.status_code == 404
+
+    def test_comment_create_queries(self, user_client, title, review,
+                                    django_assert_num_queries):
+        # Отзыв, вставка комментария, обновление даты отзыва
+        # и счетчика комментариев произведения.
+        with django_assert_num_queries(4):
+            response = user_client.post(
+                f'{TITLES_URL}{title.pk}/reviews/{review.pk}/comments/',
+                {'text': 'Комментарий'}
+            )
+        assert response.status_code == 201
+
+    def test_comment_wrong_title(self, user_client, review, category):
+        from reviews.models import Title
+
+        other = Title.objects.create(
+            name='Другое', year=2000, category=category
+        )
+        response = user_client.post(
+            f'{TITLES_URL}{other.pk}/reviews/{review.pk}/comments/',
+            {'text': 'Комментарий'}
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что отзыв ищется в рамках произведения из URL'
+        )
@@ -0,0 +1,70 @@
+import pytest
+from rest_framework.test import APIClient
+
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.fixture(autouse=True)
+def role_claims(settings):
+    from django.core.cache import cache
+    from users.authentication import user_cache
+
+    settings.JWT_ROLE_CLAIMS = {**settings.JWT_ROLE_CLAIMS, 'ENABLED': True}
+    cache.clear()
+    user_cache.clear()
+
+
+def get_client(user):
+    client = APIClient()
+    token = client.post(TOKEN_URL, {
+        'username': user.username,
+        'confirmation_code': user.confirmation_code,
+    }).json()['token']
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db
+class TestRoleClaims:
+
+    def test_token_carries_role(self, admin):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        client = APIClient()
+        token = client.post(TOKEN_URL, {
+            'username': admin.username,
+            'confirmation_code': admin.confirmation_code,
+        }).json()['token']
+        claims = AccessToken(token)
+        assert claims['role'] == 'admin'
+        assert claims['username'] == admin.username
+        assert claims['user_version'] == 0
+
+    def test_permissions_without_user_query(self, admin):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        client = get_client(admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                '/api/v1/genres/', {'name': 'Драма', 'slug': 'drama'}
+            )
+        assert response.status_code == 201
+        assert not any(
+            'FROM "users_user"' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что права проверяются по токену'
+
+    def test_role_change_revokes_token(self, admin):
+        client = get_client(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == 401
+        assert get_client(admin).get('/api/v1/users/').status_code == 403
+
+    def test_profile_edit_keeps_token(self, user):
+        client = get_client(user)
+        response = client.patch('/api/v1/users/me/', {'bio': 'О себе'})
+        assert response.status_code == 200
+        assert client.get('/api/v1/users/me/').status_code == 200
@@ -0,0 +1,74 @@
+import pytest
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def catalog(category):
+    from reviews.models import Category, Genre, Title, TitleGenre
+
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    rock = Genre.objects.create(name='Рок', slug='rock')
+    genres = {
+        'Драма': (drama,),
+        'Комедия': (comedy,),
+        'Трагикомедия': (drama, comedy),
+        'Рок-опера': (rock, drama, comedy),
+    }
+    years = {'Драма': 1960, 'Комедия': 1970, 'Трагикомедия': 1980,
+             'Рок-опера': 1990}
+    for name, title_genres in genres.items():
+        title = Title.objects.create(
+            name=name, year=years[name],
+            category=book if name == 'Комедия' else category
+        )
+        TitleGenre.objects.bulk_create(
+            TitleGenre(title=title, genre=genre) for genre in title_genres
+        )
+
+
+def get_names(client, **params):
+    response = client.get(TITLES_URL, params)
+    assert response.status_code == 200
+    return sorted(title['name'] for title in response.json()['results'])
+
+
+@pytest.mark.django_db
+class TestTitleFilters:
+
+    def test_any_genre(self, client, catalog):
+        assert get_names(client, genre='drama') == [
+            'Драма', 'Рок-опера', 'Трагикомедия'
+        ]
+        names = get_names(client, genre='drama,comedy')
+        assert names == ['Драма', 'Комедия', 'Рок-опера', 'Трагикомедия'], (
+            'Проверьте, что произведение с несколькими жанрами '
+            'возвращается один раз'
+        )
+
+    def test_all_genres(self, client, catalog):
+        assert get_names(client, genre_all='drama,comedy') == [
+            'Рок-опера', 'Трагикомедия'
+        ]
+        assert get_names(client, genre_all='drama,comedy,rock') == [
+            'Рок-опера'
+        ]
+
+    def test_categories(self, client, catalog):
+        assert get_names(client, category='book') == ['Комедия']
+        assert len(get_names(client, category='movie, book')) == 4
+
+    def test_year_range(self, client, catalog):
+        assert get_names(client, year_min=1970, year_max=1980) == [
+            'Комедия', 'Трагикомедия'
+        ]
+
+    def test_combined(self, client, catalog):
+        assert get_names(
+            client, genre='comedy', category='movie', year_min=1985
+        ) == ['Рок-опера']
+
+    def test_empty_slug_list(self, client, catalog):
+        assert get_names(client, genre=',') == []
@@ -0,0 +1,93 @@
+import pytest
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def rated_titles(category, genre, user, another_user):
+    from reviews.models import Category, Review, Title, TitleGenre
+
+    book = Category.objects.create(name='Книга', slug='book')
+    titles = {
+        name: Title.objects.create(name=name, year=year, category=current)
+        for name, year, current in (
+            ('Первое', 1990, category),
+            ('Второе', 1980, category),
+            ('Третье', 2000, book),
+            ('Без отзывов', 2010, category),
+        )
+    }
+    TitleGenre.objects.create(title=titles['Второе'], genre=genre)
+    TitleGenre.objects.create(title=titles['Третье'], genre=genre)
+    for name, scores in (('Первое', (6, 8)), ('Второе', (9,)),
+                         ('Третье', (10, 2))):
+        for author, score in zip((user, another_user), scores):
+            Review.objects.create(
+                title=titles[name], author=author, text='Текст', score=score
+            )
+    return titles
+
+
+def get_names(client, url=TITLES_URL, **params):
+    response = client.get(url, params)
+    assert response.status_code == 200
+    data = response.json()
+    if isinstance(data, dict):
+        data = data['results']
+    return [title['name'] for title in data]
+
+
+@pytest.mark.django_db
+class TestTitleOrdering:
+
+    def test_rating_avg_follows_reviews(self, rated_titles, user):
+        from reviews.models import Review, Title
+
+        assert Title.objects.get(name='Первое').rating_avg == 7
+        review = Review.objects.get(title__name='Первое', author=user)
+        review.score = 10
+        review.save()
+        assert Title.objects.get(name='Первое').rating_avg == 9
+        Review.objects.filter(title__name='Второе').delete()
+        assert Title.objects.get(name='Второе').rating_avg == 0
+
+    def test_ordering(self, client, rated_titles):
+        assert get_names(client, ordering='-rating') == [
+            'Второе', 'Первое', 'Третье', 'Без отзывов'
+        ], 'Проверьте сортировку по рейтингу'
+        assert get_names(client, ordering='year') == [
+            'Второе', 'Первое', 'Третье', 'Без отзывов'
+        ], 'Проверьте сортировку по году'
+        assert get_names(client, ordering='-review_count')[-1] == (
+            'Без отзывов'
+        ), 'Проверьте сортировку по количеству отзывов'
+
+    def test_last_review_ordering_puts_empty_last(self, client,
+                                                  rated_titles):
+        names = get_names(client, ordering='-last_review_at')
+        assert names == ['Третье', 'Второе', 'Первое', 'Без отзывов'], (
+            'Проверьте, что произведения без отзывов идут в конце'
+        )
+
+    def test_unknown_ordering_ignored(self, client, rated_titles):
+        response = client.get(TITLES_URL, {'ordering': 'description'})
+        assert response.status_code == 200
+
+    def test_cursor_ignores_ordering(self, client, rated_titles):
+        names = get_names(client, ordering='-rating', cursor='')
+        assert names == ['Первое', 'Второе', 'Третье', 'Без отзывов']
+
+    def test_top(self, client, rated_titles, django_assert_max_num_queries):
+        url = f'{TITLES_URL}top/'
+        with django_assert_max_num_queries(2):
+            names = get_names(client, url)
+        assert names == ['Второе', 'Первое', 'Третье'], (
+            'Проверьте, что в лидерборде только произведения с оценками '
+            'по убыванию рейтинга'
+        )
+        assert get_names(client, url, category='movie') == [
+            'Второе', 'Первое'
+        ]
+        assert get_names(client, url, genre='drama') == ['Второе', 'Третье']
+        assert get_names(client, url, limit=1) == ['Второе']
+        assert get_names(client, url, limit='много') == names
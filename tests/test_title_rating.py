@@ -0,0 +1,46 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_review_writes(self, title, user, another_user):
+        from reviews.models import Review, Title
+
+        assert Title.objects.get(pk=title.pk).rating is None, (
+            'Проверьте, что у произведения без отзывов рейтинг равен None'
+        )
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=4
+        )
+        Review.objects.create(
+            title=title, author=another_user, text='Текст', score=10
+        )
+        assert Title.objects.get(pk=title.pk).rating == 7, (
+            'Проверьте, что рейтинг пересчитывается при создании отзыва'
+        )
+
+        review = Review.objects.get(pk=review.pk)
+        review.score = 8
+        review.save()
+        assert Title.objects.get(pk=title.pk).rating == 9, (
+            'Проверьте, что рейтинг пересчитывается при изменении оценки'
+        )
+
+        review.delete()
+        title = Title.objects.get(pk=title.pk)
+        assert (title.rating_sum, title.rating_count) == (10, 1), (
+            'Проверьте, что рейтинг пересчитывается при удалении отзыва'
+        )
+
+    def test_rebuild_ratings(self, title, user):
+        from reviews.models import Review, Title
+
+        Review.objects.create(title=title, author=user, text='Текст', score=6)
+        Title.objects.update(rating_sum=0, rating_count=0)
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=title.pk)
+        assert (title.rating_sum, title.rating_count) == (6, 1), (
+            'Проверьте, что команда rebuild_ratings восстанавливает рейтинг'
+        )
@@ -0,0 +1,46 @@
+import pytest
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def titles(category):
+    from reviews.models import Title
+
+    names = ['Крестный отец', 'Крестный отец 2', 'Отец невесты',
+             'Побег из Шоушенка']
+    return [
+        Title.objects.create(name=name, year=1990, category=category)
+        for name in names
+    ]
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_search_ranks_matches(self, client, titles):
+        data = client.get(TITLES_URL, {'search': 'крестный отец'}).json()
+        names = [item['name'] for item in data['results']]
+        assert set(names) == {'Крестный отец', 'Крестный отец 2'}
+        assert names[0] == 'Крестный отец', (
+            'Проверьте, что результаты поиска отсортированы по релевантности'
+        )
+
+    def test_search_follows_title_changes(self, client, titles):
+        titles[3].name = 'Зеленая миля'
+        titles[3].save()
+        data = client.get(TITLES_URL, {'search': 'миля'}).json()
+        assert [item['name'] for item in data['results']] == ['Зеленая миля']
+        titles[3].delete()
+        data = client.get(TITLES_URL, {'search': 'миля'}).json()
+        assert data['results'] == []
+
+    def test_search_with_name_filter(self, client, titles):
+        data = client.get(
+            TITLES_URL, {'search': 'отец', 'name': 'невест'}
+        ).json()
+        assert [item['name'] for item in data['results']] == ['Отец невесты']
+
+    def test_search_escapes_query(self, client, titles):
+        response = client.get(TITLES_URL, {'search': '"AND OR* ('})
+        assert response.status_code == 200
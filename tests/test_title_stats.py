@@ -0,0 +1,156 @@
+import pytest
+from django.core.management import call_command
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def get_stats(title):
+    from reviews.models import Title
+
+    title = Title.objects.get(pk=title.pk)
+    scores = {
+        score: count for score, count in title.score_histogram.items()
+        if count
+    }
+    return title.review_count, scores, title.comment_count
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def test_stats_follow_writes(self, title, user, another_user):
+        from reviews.models import Comment, Review
+
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=4
+        )
+        other = Review.objects.create(
+            title=title, author=another_user, text='Текст', score=10
+        )
+        Comment.objects.create(review=review, author=user, text='Текст')
+        Comment.objects.create(review=review, author=user, text='Текст')
+        assert get_stats(title) == (2, {4: 1, 10: 1}, 2), (
+            'Проверьте, что статистика растет при создании отзывов '
+            'и комментариев'
+        )
+
+        other = Review.objects.get(pk=other.pk)
+        other.score = 4
+        other.save()
+        assert get_stats(title) == (2, {4: 2}, 2), (
+            'Проверьте, что гистограмма пересчитывается при изменении оценки'
+        )
+
+        review.delete()
+        assert get_stats(title) == (1, {4: 1}, 0), (
+            'Проверьте, что удаление отзыва убирает его оценку '
+            'и комментарии'
+        )
+
+    def test_last_review_at(self, title, user, another_user):
+        from reviews.models import Review, Title
+
+        first = Review.objects.create(
+            title=title, author=user, text='Текст', score=4
+        )
+        last = Review.objects.create(
+            title=title, author=another_user, text='Текст', score=5
+        )
+        assert Title.objects.get(pk=title.pk).last_review_at == last.pub_date
+        last.delete()
+        assert Title.objects.get(pk=title.pk).last_review_at == first.pub_date
+        first.delete()
+        assert Title.objects.get(pk=title.pk).last_review_at is None
+
+    def test_bulk_writes(self, user_client, title, user):
+        from reviews.models import Review
+
+        url = f'{TITLES_URL}{title.pk}/reviews/'
+        response = user_client.post(
+            url, [{'text': 'Текст', 'score': 9}], format='json'
+        )
+        assert response.status_code == 201
+        review = Review.objects.get(title=title, author=user)
+        response = user_client.post(
+            f'{url}{review.pk}/comments/',
+            [{'text': 'Текст'}, {'text': 'Текст'}], format='json'
+        )
+        assert response.status_code == 201
+        assert get_stats(title) == (1, {9: 1}, 2), (
+            'Проверьте, что пакетная запись обновляет статистику'
+        )
+
+    def test_stats_in_title_response(self, client, title, user):
+        from reviews.models import Review
+
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=7
+        )
+        response = client.get(f'{TITLES_URL}{title.pk}/')
+        data = response.json()
+        assert data['review_count'] == 1
+        assert data['comment_count'] == 0
+        assert data['scores']['7'] == 1
+        assert len(data['scores']) == 10
+        assert data['last_review_at'] is not None
+        assert review.pub_date.year == int(data['last_review_at'][:4])
+
+    def test_rebuild_title_stats(self, title, user):
+        from reviews.models import Comment, Review, Title
+
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=6
+        )
+        Comment.objects.create(review=review, author=user, text='Текст')
+        Title.objects.update(
+            rating_sum=0, rating_count=0, score_6=0, comment_count=0,
+            last_review_at=None
+        )
+        call_command('rebuild_title_stats')
+        assert get_stats(title) == (1, {6: 1}, 1), (
+            'Проверьте, что команда rebuild_title_stats '
+            'восстанавливает статистику'
+        )
+        title = Title.objects.get(pk=title.pk)
+        assert title.rating == 6
+        assert title.last_review_at == review.pub_date
+
+    def test_rebuild_titles_with_and_without_reviews(
+        self, title, user, another_user, django_assert_max_num_queries
+    ):
+        from reviews.management.commands.rebuild_title_stats import \
+            rebuild_title_stats
+        from reviews.models import Comment, Review, Title
+
+        titles = [title] + [
+            Title.objects.create(name=f'Фильм {index}', year=2000)
+            for index in range(4)
+        ]
+        for index, item in enumerate(titles[:3]):
+            review = Review.objects.create(
+                title=item, author=user, text='Текст', score=index + 1
+            )
+            Review.objects.create(
+                title=item, author=another_user, text='Текст', score=10
+            )
+            if index != 1:
+                Comment.objects.create(
+                    review=review, author=user, text='Текст'
+                )
+        Review.objects.filter(title=titles[2]).delete()
+        Title.objects.update(
+            rating_sum=7, rating_count=1, score_7=1, comment_count=3
+        )
+        with django_assert_max_num_queries(6):
+            assert rebuild_title_stats() == len(titles)
+        assert [get_stats(item) for item in titles] == [
+            (2, {1: 1, 10: 1}, 1),
+            (2, {2: 1, 10: 1}, 0),
+            (0, {}, 0),
+            (0, {}, 0),
+            (0, {}, 0),
+        ], (
+            'Проверьте, что rebuild_title_stats пересчитывает статистику '
+            'всех произведений за постоянное число запросов'
+        )
+        assert Title.objects.get(pk=titles[3].pk).last_review_at is None
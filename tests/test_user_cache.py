@@ -0,0 +1,61 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    from users.authentication import user_cache
+    user_cache.clear()
+
+
+@pytest.fixture
+def token_client(user):
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    client = APIClient()
+    token = RefreshToken.for_user(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "users_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+class TestUserCache:
+
+    def test_second_request_skips_user_query(self, token_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        assert token_client.get('/api/v1/users/').status_code == 403
+        with CaptureQueriesContext(connection) as context:
+            assert token_client.get('/api/v1/users/').status_code == 403
+        assert user_queries(context) == [], (
+            'Проверьте, что пользователь берется из кэша'
+        )
+
+    def test_role_change_invalidates_cache(self, token_client, user):
+        assert token_client.get('/api/v1/users/').status_code == 403
+        user.role = 'admin'
+        user.save()
+        assert token_client.get('/api/v1/users/').status_code == 200
+
+    def test_inactive_user_is_rejected(self, token_client, user):
+        assert token_client.get('/api/v1/users/').status_code == 403
+        user.is_active = False
+        user.save()
+        assert token_client.get('/api/v1/users/').status_code == 401
+
+    def test_me_returns_full_profile(self, token_client, user):
+        token_client.get('/api/v1/users/me/')
+        response = token_client.get('/api/v1/users/me/')
+        assert response.json()['email'] == user.email
+        response = token_client.patch('/api/v1/users/me/', {'bio': 'О себе'})
+        assert response.json()['email'] == user.email
+        user.refresh_from_db()
+        assert user.bio == 'О себе'